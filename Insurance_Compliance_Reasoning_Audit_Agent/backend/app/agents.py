@@ -3,6 +3,30 @@ import concurrent.futures
 from crewai import Agent, Task, Crew, Process
 from langchain_openai import ChatOpenAI
 from . import schemas, models
+from .projection import project_attributes
+
+# Bump whenever the interpreter prompt changes so cached interpretations are redone
+PROMPT_TEMPLATE_VERSION = "1"
+
+
+def _kickoff(crew: Crew, timeout: int, action: str) -> str:
+    """Run a crew with a hard timeout and return its raw text output."""
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        future = executor.submit(crew.kickoff)
+        try:
+            result = future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            raise Exception(f"{action} timed out after {timeout} seconds")
+    return result.raw
+
+
+def _extract_json(raw_output: str) -> str:
+    """Strip markdown code fences the LLM may wrap its JSON in."""
+    if "```json" in raw_output:
+        return raw_output.split("```json")[1].split("```")[0].strip()
+    if "```" in raw_output:
+        return raw_output.split("```")[1].split("```")[0].strip()
+    return raw_output
 
 
 class PolicyInterpreterAgent:
@@ -60,23 +84,78 @@ class PolicyInterpreterAgent:
             process=Process.sequential
         )
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(crew.kickoff)
-            try:
-                result = future.result(timeout=self.timeout)
-            except concurrent.futures.TimeoutError:
-                raise Exception(f"Rule interpretation timed out after {self.timeout} seconds")
+        # The raw string output is kept alongside the parsed structure
+        raw_output = _kickoff(crew, self.timeout, "Rule interpretation")
+        structured_data = json.loads(_extract_json(raw_output))
+        return self._to_structured(structured_data, raw_output)
 
-        # result.raw is the string output. We need to parse it.
-        raw_output = result.raw
-        json_str = raw_output
-        if "```json" in raw_output:
-            json_str = raw_output.split("```json")[1].split("```")[0].strip()
-        elif "```" in raw_output:
-            json_str = raw_output.split("```")[1].split("```")[0].strip()
+    def interpret_many(
+        self,
+        rules: list[models.ComplianceRule]
+    ) -> dict[str, schemas.StructuredRuleCreate]:
+        """
+        Interpret several rules with a single LLM call.
 
-        structured_data = json.loads(json_str)
+        Returns structured rules keyed by rule_id; rules the model left out of
+        its answer are simply missing from the result so callers can retry them.
+        """
+        if len(rules) == 1:
+            return {rules[0].rule_id: self.interpret(rules[0])}
 
+        rules_block = "\n".join(
+            f"""
+            Rule ID: {rule.rule_id}
+            Category: {rule.category}
+            Severity: {rule.severity}
+            Version: {rule.version}
+            Rule Text: {rule.rule_text}
+            """ for rule in rules
+        )
+        task = Task(
+            description=f"""
+            Interpret each of the following compliance rules independently:
+            {rules_block}
+
+            For EACH rule extract:
+            1. Applicability Conditions: Under what circumstances does this rule apply?
+            2. Obligations: What MUST be done or NOT be done?
+            3. Exceptions: Are there any cases where this rule does not apply?
+
+            Output MUST be a valid JSON array with one object per rule, in the
+            same order, each matching this structure:
+            [
+                {{
+                    "rule_id": "<Rule ID>",
+                    "version": "<Version>",
+                    "applicability_conditions": ["condition1", "condition2"],
+                    "obligations": ["obligation1", "obligation2"],
+                    "exceptions": ["exception1", "exception2"],
+                    "severity": "<Severity>"
+                }}
+            ]
+            """,
+            expected_output="A JSON array of structured rule representations.",
+            agent=self.agent
+        )
+
+        crew = Crew(
+            agents=[self.agent],
+            tasks=[task],
+            process=Process.sequential
+        )
+
+        raw_output = _kickoff(crew, self.timeout * len(rules), "Batch rule interpretation")
+        requested = {rule.rule_id for rule in rules}
+        interpreted = {}
+        for structured_data in json.loads(_extract_json(raw_output)):
+            if structured_data.get("rule_id") in requested:
+                interpreted[structured_data["rule_id"]] = self._to_structured(
+                    structured_data, json.dumps(structured_data)
+                )
+        return interpreted
+
+    @staticmethod
+    def _to_structured(structured_data: dict, raw_output: str) -> schemas.StructuredRuleCreate:
         return schemas.StructuredRuleCreate(
             rule_id=structured_data["rule_id"],
             version=structured_data["version"],
@@ -130,6 +209,7 @@ class ComplianceReasoningAgent:
                 "severity": r.severity
             } for r in rules
         ]
+        attributes, projection = project_attributes(event.attributes, rules)
 
         task = Task(
             description=f"""
@@ -139,7 +219,7 @@ class ComplianceReasoningAgent:
             ID: {event.workflow_id}
             Type: {event.workflow_type}
             Actor: {event.actor_id}
-            Attributes: {json.dumps(event.attributes)}
+            Attributes: {json.dumps(attributes)}
 
             Structured Rules:
             {json.dumps(rules_json)}
@@ -180,25 +260,17 @@ class ComplianceReasoningAgent:
             process=Process.sequential
         )
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(crew.kickoff)
-            try:
-                result = future.result(timeout=self.timeout)
-            except concurrent.futures.TimeoutError:
-                raise Exception(f"Compliance reasoning timed out after {self.timeout} seconds")
-
-        raw_output = result.raw
-        json_str = raw_output
-        if "```json" in raw_output:
-            json_str = raw_output.split("```json")[1].split("```")[0].strip()
-        elif "```" in raw_output:
-            json_str = raw_output.split("```")[1].split("```")[0].strip()
-            
+        raw_output = _kickoff(crew, self.timeout, "Compliance reasoning")
+        json_str = _extract_json(raw_output)
+
         try:
-            return json.loads(json_str)
+            evaluation = json.loads(json_str)
         except json.JSONDecodeError:
             # Fallback: simple cleaning for common LLM JSON errors (like trailing commas or unescaped quotes)
             import re
             # Remove trailing commas before closing braces/brackets
             cleaned = re.sub(r',\s*([\]}])', r'\1', json_str)
-            return json.loads(cleaned)
+            evaluation = json.loads(cleaned)
+
+        evaluation["attribute_projection"] = projection
+        return evaluation
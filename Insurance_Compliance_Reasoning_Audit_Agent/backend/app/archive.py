@@ -0,0 +1,307 @@
+import os
+import enum
+import gzip
+import json
+import heapq
+import hashlib
+from datetime import date, datetime, timezone
+from typing import Iterable, List, Optional
+
+from sqlalchemy import select, insert, delete, func, inspect, DateTime, Enum
+
+from . import models
+
+# Relative paths are taken from backend/, not the working directory, so the app
+# and archive_partitions.py agree wherever each is started from
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARCHIVE_DIR = os.path.join(BACKEND_DIR, os.getenv("ARCHIVE_DIR", "archive"))
+ARCHIVE_AFTER_MONTHS = int(os.getenv("ARCHIVE_AFTER_MONTHS", "24"))
+
+Partition = models.ArchivePartition
+PartitionWorkflow = models.ArchivePartitionWorkflow
+
+# Archivable tables and the timestamp their rows are partitioned by
+TIME_COLUMNS = {
+    models.WorkflowEvent: models.WorkflowEvent.submitted_at,
+    models.ComplianceDecision: models.ComplianceDecision.created_at,
+}
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _as_datetime(month: date) -> datetime:
+    return datetime(month.year, month.month, 1)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Cannot archive value of type {type(value).__name__}")
+
+
+def _write_file(relative_path: str, rows: list) -> str:
+    """Write rows as gzipped JSON lines, durably and read-only. Returns the file's sha256."""
+    path = os.path.join(ARCHIVE_DIR, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as out:
+            for row in rows:
+                out.write(json.dumps(row, default=_json_default, separators=(",", ":")).encode())
+                out.write(b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.chmod(tmp_path, 0o444)
+    os.replace(tmp_path, path)
+    with open(path, "rb") as written:
+        return hashlib.sha256(written.read()).hexdigest()
+
+
+def _read_file(relative_path: str, table_name: str):
+    """Decoded rows of one partition file, streamed so only one row is held at a time."""
+    table = models.Base.metadata.tables[table_name]
+    timestamps = [c.name for c in table.columns if isinstance(c.type, DateTime)]
+    enums = {
+        c.name: c.type.enum_class for c in table.columns
+        if isinstance(c.type, Enum) and c.type.enum_class is not None
+    }
+    with gzip.open(os.path.join(ARCHIVE_DIR, relative_path), "rb") as archived:
+        for line in archived:
+            row = json.loads(line)
+            for name in timestamps:
+                if row.get(name) is not None:
+                    row[name] = datetime.fromisoformat(row[name])
+            for name, enum_class in enums.items():
+                if row.get(name) is not None:
+                    row[name] = enum_class(row[name])
+            yield row
+
+
+def _instance(model, row: dict):
+    """A transient model instance for an archived row."""
+    return model(**{
+        attr.key: row[attr.columns[0].name] for attr in inspect(model).column_attrs
+    })
+
+
+def months_to_archive(connection, model, before: date) -> List[date]:
+    """Months with rows older than the given month, oldest first."""
+    time_column = TIME_COLUMNS[model]
+    oldest = connection.execute(
+        select(func.min(time_column)).where(time_column < _as_datetime(before))
+    ).scalar()
+    if oldest is None:
+        return []
+    months, month = [], month_start(oldest)
+    while month < before:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def archive_month(connection, model, month: date) -> int:
+    """
+    Move one month of rows from a hot table into an archive file, in the
+    caller's transaction. The file is written and synced before the rows are
+    deleted, so a failed transaction leaves only an uncatalogued file behind.
+    Returns the number of rows moved.
+    """
+    table = model.__table__
+    time_column = TIME_COLUMNS[model]
+    statement = select(table).where(
+        time_column >= _as_datetime(month), time_column < _as_datetime(add_months(month, 1))
+    )
+    if connection.dialect.name == "sqlite":
+        # SQLite hands out max(id) + 1, so the newest row stays to keep ids unique
+        statement = statement.where(table.c.id < select(func.max(table.c.id)).scalar_subquery())
+    rows = [dict(r) for r in connection.execute(
+        statement.order_by(time_column, table.c.id)
+    ).mappings()]
+    if not rows:
+        return 0
+
+    earlier = connection.execute(
+        select(func.count()).select_from(Partition).where(
+            Partition.table_name == table.name, Partition.month == month
+        )
+    ).scalar()
+    # Rows that arrive for an already archived month go to an extra file
+    suffix = f"-{earlier + 1}" if earlier else ""
+    relative_path = f"{table.name}/{month:%Y-%m}{suffix}.jsonl.gz"
+    digest = _write_file(relative_path, rows)
+
+    ids = [r["id"] for r in rows]
+    partition_id = connection.execute(insert(Partition.__table__).values(
+        table_name=table.name,
+        month=month,
+        path=relative_path,
+        sha256=digest,
+        row_count=len(rows),
+        min_id=min(ids),
+        max_id=max(ids)
+    )).inserted_primary_key[0]
+    connection.execute(insert(PartitionWorkflow.__table__), [
+        {"workflow_id": workflow_id, "partition_id": partition_id}
+        for workflow_id in sorted({r["workflow_id"] for r in rows})
+    ])
+
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        if model is models.ComplianceDecision:
+            # The violation index only covers decisions still in the hot table
+            connection.execute(delete(models.DecisionViolation.__table__).where(
+                models.DecisionViolation.decision_id.in_(chunk)
+            ))
+        connection.execute(delete(table).where(table.c.id.in_(chunk)))
+    return len(rows)
+
+
+def partitions_statement(model, ids: Optional[Iterable[int]] = None, workflow_ids=None, start=None, end=None):
+    """
+    Catalog rows of the partitions of a table that may hold the given ids or
+    workflows, or rows from the [start, end) time range.
+    """
+    statement = select(Partition.id, Partition.month, Partition.path).where(
+        Partition.table_name == model.__tablename__
+    )
+    if ids is not None:
+        statement = statement.where(Partition.min_id <= max(ids), Partition.max_id >= min(ids))
+    if workflow_ids is not None:
+        statement = statement.where(Partition.id.in_(
+            select(PartitionWorkflow.partition_id).where(PartitionWorkflow.workflow_id.in_(list(workflow_ids)))
+        ))
+    if start is not None:
+        statement = statement.where(Partition.month >= month_start(_utc(start)))
+    if end is not None:
+        statement = statement.where(Partition.month < _utc(end).date())
+    return statement
+
+
+def partition_paths(connection, model, ids=None, workflow_ids=None, start=None, end=None) -> List[str]:
+    """Files that may hold matching rows, oldest month first. Works with a Session too."""
+    if ids is not None and not ids:
+        return []
+    rows = connection.execute(partitions_statement(model, ids, workflow_ids, start, end)).all()
+    # The catalog is small; ordering here keeps the index lookups free of a sort
+    return [row.path for row in sorted(rows, key=lambda r: (r.month, r.id))]
+
+
+def _utc(value: datetime) -> datetime:
+    # Archived timestamps from SQLite are naive UTC, like the rows they came from
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def partition_rows(path: str, model, ids=None, workflow_ids=None, start=None, end=None):
+    """Matching rows of one archive file as transient model instances, in time order."""
+    time_key = TIME_COLUMNS[model].key
+    start = None if start is None else _utc(start)
+    end = None if end is None else _utc(end)
+    for row in _read_file(path, model.__tablename__):
+        if ids is not None and row["id"] not in ids:
+            continue
+        if workflow_ids is not None and row["workflow_id"] not in workflow_ids:
+            continue
+        if start is not None and _utc(row[time_key]) < start:
+            continue
+        if end is not None and _utc(row[time_key]) >= end:
+            continue
+        yield _instance(model, row)
+
+
+def iter_rows(connection, model, ids=None, workflow_ids=None, start=None, end=None):
+    """
+    Archived rows as transient model instances, oldest partition first. Only
+    partitions whose id range, workflow list or month can match are read.
+    """
+    ids = None if ids is None else set(ids)
+    workflow_ids = None if workflow_ids is None else set(workflow_ids)
+    for path in partition_paths(connection, model, ids, workflow_ids, start, end):
+        yield from partition_rows(path, model, ids, workflow_ids, start, end)
+
+
+def find_rows(session, model, ids=None, workflow_id: Optional[str] = None) -> list:
+    """
+    Archived rows by id or by workflow. Pass as AsyncSession.run_sync(find_rows, ...)
+    from async code.
+    """
+    workflow_ids = None if workflow_id is None else [workflow_id]
+    return list(iter_rows(session.connection(), model, ids, workflow_ids))
+
+
+def newest_rows(session, model, limit: int, before=None, start=None, end=None, matches=None) -> list:
+    """
+    Up to `limit` archived rows newest first on (time, id): those below the
+    `before` (time, id) key and in the [start, end) range, that `matches`
+    keeps. `matches` takes the session and a list of rows and returns the
+    ones to keep, so it can look things up a chunk at a time. Months are read newest first until
+    enough rows are found, holding at most `limit` rows of a month at once.
+    """
+    time_key = TIME_COLUMNS[model].key
+    key = lambda row: (_utc(getattr(row, time_key)), row.id)
+    before = None if before is None else (_utc(before[0]), before[1])
+    months = {}
+    for row in session.execute(partitions_statement(model, start=start, end=end)).all():
+        months.setdefault(row.month, []).append((row.id, row.path))
+
+    found = []
+    for month in sorted(months, reverse=True):
+        if len(found) >= limit:
+            break
+        if before is not None and month > month_start(before[0]):
+            continue
+        kept, chunk = [], []
+        for path in [path for _, path in sorted(months[month])]:
+            for row in partition_rows(path, model, start=start, end=end):
+                if before is None or key(row) < before:
+                    chunk.append(row)
+                if len(chunk) >= 500:
+                    kept = heapq.nlargest(limit - len(found), kept + (matches(session, chunk) if matches else chunk), key=key)
+                    chunk = []
+        kept = heapq.nlargest(limit - len(found), kept + (matches(session, chunk) if matches else chunk), key=key)
+        # Months do not overlap in time, so appending keeps the order
+        found.extend(kept)
+    return found
+
+
+def complete_page(session, model, rows: list, limit: int, before=None, start=None, end=None, matches=None) -> list:
+    """
+    Merge archived rows into a newest-first keyset page of hot rows (the
+    limit + 1 fetched). Archived rows are all older than archived_until, so
+    the archive is only read when the hot rows run out or reach below it,
+    and the [start, end) range does too. Pass as AsyncSession.run_sync(...).
+    """
+    until = archived_until(session, model)
+    if until is None:
+        return rows
+    boundary = _utc(_as_datetime(until))
+    time_key = TIME_COLUMNS[model].key
+    key = lambda row: (_utc(getattr(row, time_key)), row.id)
+    if start is not None and _utc(start) >= boundary:
+        return rows
+    if len(rows) > limit and key(rows[-1])[0] >= boundary:
+        return rows
+    archived = newest_rows(session, model, limit + 1, before, start, end, matches)
+    return heapq.nlargest(limit + 1, list(rows) + archived, key=key)
+
+
+def latest_month_statement(model):
+    return select(Partition.month).where(
+        Partition.table_name == model.__tablename__
+    ).order_by(Partition.month.desc()).limit(1)
+
+
+def archived_until(connection, model) -> Optional[date]:
+    """First month that has not been archived for a table, or None if none has."""
+    latest = connection.execute(latest_month_statement(model)).scalar()
+    return None if latest is None else add_months(latest, 1)
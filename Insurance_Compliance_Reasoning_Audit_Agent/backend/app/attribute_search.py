@@ -0,0 +1,114 @@
+import os
+import re
+import json
+from typing import Dict, List
+
+from sqlalchemy import Index, func, inspect, literal, literal_column, or_, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.schema import CreateIndex
+
+from . import models
+
+# Attribute paths (dot-separated) given an expression index on SQLite.
+# Postgres needs no list: the GIN index on attributes covers every key.
+WORKFLOW_ATTRIBUTE_INDEXES = [
+    p.strip() for p in os.getenv(
+        "WORKFLOW_ATTRIBUTE_INDEXES", "claim_id,customer_id,mfa_used"
+    ).split(",") if p.strip()
+]
+FILTER_PREFIX = "attr."
+_PATH = re.compile(r"^[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)*$")
+
+attributes = models.WorkflowEvent.attributes
+
+
+def _json_path(path: str) -> str:
+    return "$." + path
+
+
+def _extract(path: str):
+    # The path is inlined rather than bound: SQLite only matches an expression
+    # index when the query expression is textually identical. Paths are
+    # validated against _PATH, so quoting is safe.
+    return func.json_extract(attributes, literal_column(f"'{_json_path(path)}'"))
+
+
+def _index_name(path: str) -> str:
+    return "ix_workflow_events_attr_" + path.replace(".", "_")
+
+
+# Same expression as _extract(), so the planner matches queries to these indexes.
+# This is what a virtual generated column plus an index on it compiles to.
+SQLITE_ATTRIBUTE_INDEXES = {
+    path: Index(_index_name(path), _extract(path)).ddl_if(dialect="sqlite")
+    for path in WORKFLOW_ATTRIBUTE_INDEXES if _PATH.match(path)
+}
+
+
+def ensure_attribute_indexes(engine) -> None:
+    """Create any configured SQLite attribute index that does not exist yet."""
+    if engine.dialect.name != "sqlite" or not inspect(engine).has_table("workflow_events"):
+        return
+    # checkfirst cannot reflect expression indexes, so rely on IF NOT EXISTS
+    with engine.begin() as connection:
+        for index in SQLITE_ATTRIBUTE_INDEXES.values():
+            connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+def parse_filters(query_params) -> Dict[str, str]:
+    """Pull attr.<path>=<value> pairs out of a query string."""
+    filters = {}
+    for key, value in query_params.items():
+        if key.startswith(FILTER_PREFIX):
+            path = key[len(FILTER_PREFIX):]
+            if not _PATH.match(path):
+                raise ValueError(f"Invalid attribute path '{path}'")
+            filters[path] = value
+    return filters
+
+
+def _candidates(raw: str) -> List:
+    """A query-string value may stand for a JSON scalar (123, false) or the literal string."""
+    values = [raw]
+    try:
+        parsed = json.loads(raw)
+    except ValueError:
+        return values
+    if isinstance(parsed, (bool, int, float)) and parsed != raw:
+        values.append(parsed)
+    return values
+
+
+def _nested(path: str, value) -> dict:
+    document = value
+    for key in reversed(path.split(".")):
+        document = {key: document}
+    return document
+
+
+def attribute_condition(dialect_name: str, path: str, raw: str):
+    values = _candidates(raw)
+    if dialect_name == "postgresql":
+        # jsonb @> containment, served by the GIN index
+        return or_(*[
+            type_coerce(attributes, JSONB).contains(_nested(path, value))
+            for value in values
+        ])
+    if dialect_name == "sqlite" and path not in SQLITE_ATTRIBUTE_INDEXES:
+        raise LookupError(
+            f"Attribute '{path}' is not indexed; add it to WORKFLOW_ATTRIBUTE_INDEXES"
+        )
+    return _extract(path).in_([literal(value) for value in values])
+
+
+def attribute_matches(document, path: str, raw: str) -> bool:
+    """attribute_condition() for a decoded attributes document, such as an archived event's."""
+    for key in path.split("."):
+        if not isinstance(document, dict) or key not in document:
+            return False
+        document = document[key]
+    # bool is an int in Python, but true must not match 1
+    return any(
+        document == value and isinstance(document, bool) == isinstance(value, bool)
+        for value in _candidates(raw)
+    )
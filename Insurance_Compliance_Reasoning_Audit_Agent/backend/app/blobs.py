@@ -0,0 +1,82 @@
+import os
+import json
+import zlib
+import hashlib
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select, insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+BLOB_ENCODING = "zlib"
+BLOB_COMPRESSION_LEVEL = int(os.getenv("BLOB_COMPRESSION_LEVEL", "6"))
+
+
+def encode_json(value) -> bytes:
+    # Canonical form, so equal content always hashes the same
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def compress(data: bytes) -> bytes:
+    return zlib.compress(data, BLOB_COMPRESSION_LEVEL)
+
+
+def decompress(encoding: str, data: bytes) -> bytes:
+    if encoding != BLOB_ENCODING:
+        raise ValueError(f"Unsupported blob encoding '{encoding}'")
+    return zlib.decompress(data)
+
+
+def put_many(connection, table, payloads: Iterable[bytes]) -> List[str]:
+    """
+    Store payloads in the blob table, skipping any already present, and return
+    their hashes in input order. Blobs are never updated: an existing hash
+    already holds identical content.
+    """
+    payloads = list(payloads)
+    hashes = [content_hash(p) for p in payloads]
+    rows = {}
+    for digest, payload in zip(hashes, payloads):
+        if digest not in rows:
+            rows[digest] = {
+                "hash": digest,
+                "encoding": BLOB_ENCODING,
+                "size": len(payload),
+                "data": compress(payload)
+            }
+    if not rows:
+        return hashes
+
+    dialect_insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(
+        connection.dialect.name
+    )
+    if dialect_insert is not None:
+        connection.execute(
+            dialect_insert(table).on_conflict_do_nothing(index_elements=[table.c.hash]),
+            list(rows.values())
+        )
+    else:
+        existing = set(connection.execute(
+            select(table.c.hash).where(table.c.hash.in_(list(rows)))
+        ).scalars())
+        missing = [row for digest, row in rows.items() if digest not in existing]
+        if missing:
+            connection.execute(insert(table), missing)
+    return hashes
+
+
+def get_many(connection, table, hashes: Iterable[str]) -> Dict[str, bytes]:
+    """Decompressed payloads by hash, fetched in IN-list chunks."""
+    hashes = list(set(hashes))
+    payloads = {}
+    for i in range(0, len(hashes), 500):
+        for digest, encoding, data in connection.execute(
+            select(table.c.hash, table.c.encoding, table.c.data).where(
+                table.c.hash.in_(hashes[i:i + 500])
+            )
+        ):
+            payloads[digest] = decompress(encoding, data)
+    return payloads
@@ -1,5 +1,6 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -8,12 +9,123 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./compliance.db")
 
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+# Engine profile: auto picks "sqlite" or "postgres" from the URL; "default" keeps driver defaults
+DB_ENGINE_PROFILE = os.getenv("DB_ENGINE_PROFILE", "auto")
+
+# SQLite profile
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+
+# Postgres profile
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+
+def _dialect(url: str) -> str:
+    return url.split("://", 1)[0].split("+")[0]
+
+
+def _resolve_profile(url: str, profile: str) -> str:
+    if profile != "auto":
+        return profile
+    dialect = _dialect(url)
+    if dialect == "sqlite":
+        return "sqlite"
+    if dialect in ("postgresql", "postgres"):
+        return "postgres"
+    return "default"
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Per-connection SQLite tuning: WAL lets readers run alongside the single writer."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.close()
+
+
+def _engine_options(url: str, profile: str) -> dict:
+    dialect = _dialect(url)
+    if dialect == "sqlite":
+        connect_args = {"check_same_thread": False}
+        if profile == "sqlite":
+            connect_args["timeout"] = SQLITE_BUSY_TIMEOUT_MS / 1000
+        return {"connect_args": connect_args}
+
+    if profile != "postgres":
+        return {}
+    if "asyncpg" in url:
+        connect_args = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+    else:
+        connect_args = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+        "connect_args": connect_args,
+    }
+
+
+def build_engine(url: str, profile: str = DB_ENGINE_PROFILE):
+    profile = _resolve_profile(url, profile)
+    new_engine = create_engine(url, **_engine_options(url, profile))
+    if profile == "sqlite":
+        event.listen(new_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+
+def build_async_engine(url: str, profile: str = DB_ENGINE_PROFILE):
+    profile = _resolve_profile(url, profile)
+    new_engine = create_async_engine(url, **_engine_options(url, profile))
+    if profile == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+
+engine = build_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching asyncio driver."""
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+")[0]
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+
+# Async path for `async def` endpoints so DB round trips don't block the event loop
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+async_engine = build_async_engine(ASYNC_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Optional read replica for GET endpoints that can tolerate replication lag.
+# Writes, and reads that must see the caller's own writes, stay on the primary.
+READ_REPLICA_ENABLED = os.getenv("READ_REPLICA_ENABLED", "false").lower() in ("1", "true", "yes")
+READ_REPLICA_URL = os.getenv("READ_REPLICA_URL")
+if READ_REPLICA_ENABLED and READ_REPLICA_URL:
+    ASYNC_READ_REPLICA_URL = os.getenv("ASYNC_READ_REPLICA_URL", _async_url(READ_REPLICA_URL))
+    read_async_engine = build_async_engine(ASYNC_READ_REPLICA_URL)
+else:
+    read_async_engine = async_engine
+AsyncReadSessionLocal = async_sessionmaker(
+    read_async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 def get_db():
@@ -22,3 +134,14 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """Session on the read replica when one is configured, otherwise the primary."""
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,147 @@
+import io
+import os
+import csv
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from . import models, archive
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+Decision = models.ComplianceDecision
+CSV_COLUMNS = [
+    "id", "workflow_id", "workflow_event_id", "decision", "violated_rules",
+    "rule_set_id", "rule_versions", "created_at", "reasoning_trace"
+]
+
+
+def decisions_statement(
+    rule_id: Optional[str] = None,
+    rule_set_id: Optional[str] = None,
+    outcome: Optional[models.DecisionOutcome] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+):
+    """Hot-table decisions matching the filters, oldest first, walking a (time, id) index."""
+    statement = select(Decision)
+    if rule_id is not None:
+        # Drive from the violation index; its created_at mirrors the decision's
+        Violation = models.DecisionViolation
+        statement = statement.join(Violation, Violation.decision_id == Decision.id).where(
+            Violation.rule_id == rule_id
+        )
+        sort_column, id_column = Violation.created_at, Violation.decision_id
+    else:
+        sort_column, id_column = Decision.created_at, Decision.id
+    if rule_set_id is not None:
+        statement = statement.where(Decision.rule_set_id == rule_set_id)
+    if outcome is not None:
+        statement = statement.where(Decision.decision == outcome)
+    if created_from is not None:
+        statement = statement.where(sort_column >= created_from)
+    if created_to is not None:
+        statement = statement.where(sort_column < created_to)
+    return statement.order_by(sort_column, id_column)
+
+
+def _archived_rows(path: str, rule_id, rule_set_id, outcome, created_from, created_to):
+    return (
+        d for d in archive.partition_rows(path, Decision, start=created_from, end=created_to)
+        if (rule_id is None or rule_id in (d.violated_rules or []))
+        and (rule_set_id is None or d.rule_set_id == rule_set_id)
+        and (outcome is None or d.decision == outcome)
+    )
+
+
+def _next_batch(rows) -> List:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            break
+    return batch
+
+
+async def decision_batches(
+    db,
+    rule_id: Optional[str] = None,
+    rule_set_id: Optional[str] = None,
+    outcome: Optional[models.DecisionOutcome] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_trace: bool = True
+) -> AsyncIterator[List]:
+    """
+    Matching decisions in batches of EXPORT_BATCH_SIZE, oldest first:
+    archived months streamed one file at a time, then the hot table through
+    a server-side cursor. Rule versions (and traces, if asked for) are
+    resolved per batch, so memory stays bounded by the batch size.
+    """
+    filters = (rule_id, rule_set_id, outcome, created_from, created_to)
+    versions = {}
+
+    async def resolve(batch):
+        if include_trace:
+            await db.run_sync(models.load_blob_attributes, batch, "reasoning_trace")
+        await db.run_sync(models.load_rule_versions, batch, versions)
+        return batch
+
+    paths = await db.run_sync(archive.partition_paths, Decision, None, None, created_from, created_to)
+    for path in paths:
+        rows = _archived_rows(path, *filters)
+        try:
+            # Each batch is read off the file in a worker thread, resuming the same stream
+            while batch := await run_in_threadpool(_next_batch, rows):
+                yield await resolve(batch)
+        finally:
+            rows.close()
+
+    result = await db.stream_scalars(
+        decisions_statement(*filters).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    # The identity map holds rows weakly, so written batches are released
+    async for batch in result.partitions():
+        yield await resolve(batch)
+
+
+def _record(decision, include_trace: bool) -> dict:
+    record = {
+        "id": decision.id,
+        "workflow_id": decision.workflow_id,
+        "workflow_event_id": decision.workflow_event_id,
+        "decision": decision.decision.value,
+        "violated_rules": decision.violated_rules,
+        "rule_set_id": decision.rule_set_id,
+        "rule_versions": decision.rule_versions,
+        "created_at": decision.created_at.isoformat()
+    }
+    if include_trace:
+        record["reasoning_trace"] = decision.reasoning_trace
+    return record
+
+
+def ndjson_chunk(batch, include_trace: bool = True) -> str:
+    return "".join(json.dumps(_record(d, include_trace)) + "\n" for d in batch)
+
+
+def csv_header(include_trace: bool = True) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([c for c in CSV_COLUMNS if include_trace or c != "reasoning_trace"])
+    return buffer.getvalue()
+
+
+def csv_chunk(batch, include_trace: bool = True) -> str:
+    """Rows for a batch; list and dict values are written as JSON."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for decision in batch:
+        record = _record(decision, include_trace)
+        writer.writerow([
+            json.dumps(record[c]) if isinstance(record[c], (list, dict)) else record[c]
+            for c in CSV_COLUMNS if c in record
+        ])
+    return buffer.getvalue()
@@ -0,0 +1,149 @@
+import os
+import time
+import queue
+import logging
+import threading
+import concurrent.futures
+from typing import List, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import models
+
+logger = logging.getLogger("compliance-audit")
+
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "50"))
+GROUP_COMMIT_MAX_WAIT_MS = float(os.getenv("GROUP_COMMIT_MAX_WAIT_MS", "5"))
+
+
+def _reset(decision: models.ComplianceDecision) -> None:
+    """
+    Undo what a rolled-back flush assigned, so the decision inserts afresh.
+    The flush left the id and the content_blobs refs set, but the blobs went
+    with the rollback, and store_blobs skips rows whose refs are already set.
+    """
+    decision.id = None
+    decision.reasoning_trace_refs = None
+
+
+class DecisionWriter:
+    """
+    Group-commits ComplianceDecisions from concurrent audits.
+
+    Callers hand over a transient decision and block until the transaction
+    containing it has committed, so a returned decision is as durable as one
+    committed inline. A single background thread drains the queue: it takes
+    whatever is waiting, lingers up to max_wait_ms for more, and commits at
+    most max_batch decisions per transaction. If a batch fails, its decisions
+    are retried one per transaction so one bad row cannot fail the others.
+    Decisions bound for different engines are committed separately.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = GROUP_COMMIT_MAX_BATCH,
+        max_wait_ms: float = GROUP_COMMIT_MAX_WAIT_MS
+    ):
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue[Tuple[object, models.ComplianceDecision, concurrent.futures.Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._started_at = time.monotonic()
+        self._commits = 0
+        self._decisions = 0
+        self._max_batch_seen = 0
+
+    def write(self, db: Session, decision: models.ComplianceDecision) -> models.ComplianceDecision:
+        """
+        Persist a decision and return it once committed, detached but with
+        its id and server defaults loaded. Raises whatever the insert raised.
+
+        The caller's session is committed first, since the decision may
+        reference rows it added (such as a new rule-set snapshot), and its
+        engine is the one the decision is written to.
+        """
+        db.commit()
+        future = concurrent.futures.Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="decision-writer", daemon=True
+                )
+                self._thread.start()
+        self._queue.put((db.get_bind(), decision, future))
+        return future.result()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            commits, decisions, largest = self._commits, self._decisions, self._max_batch_seen
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "commits": commits,
+            "decisions": decisions,
+            "commits_per_second": commits / elapsed,
+            "average_batch_size": decisions / commits if commits else 0.0,
+            "max_batch_size": largest
+        }
+
+    def _next_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, bind, decisions: List[models.ComplianceDecision]) -> None:
+        # Keep the flushed state (id, created_at) readable after the session closes
+        db = Session(bind=bind, autoflush=False, expire_on_commit=False)
+        try:
+            db.add_all(decisions)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        with self._lock:
+            self._commits += 1
+            self._decisions += len(decisions)
+            self._max_batch_seen = max(self._max_batch_seen, len(decisions))
+
+    def _run(self) -> None:
+        while True:
+            batches = {}
+            for bind, decision, future in self._next_batch():
+                batches.setdefault(bind, []).append((decision, future))
+            for bind, batch in batches.items():
+                self._write_batch(bind, batch)
+
+    def _write_batch(self, bind, batch: list) -> None:
+        try:
+            self._commit(bind, [decision for decision, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            logger.warning(f"Group commit of {len(batch)} decisions failed, retrying singly: {str(e)}")
+            for decision, future in batch:
+                _reset(decision)
+                try:
+                    self._commit(bind, [decision])
+                except Exception as single_error:
+                    future.set_exception(single_error)
+                else:
+                    future.set_result(decision)
+            return
+        for decision, future in batch:
+            future.set_result(decision)
@@ -0,0 +1,81 @@
+from datetime import datetime
+from sqlalchemy import select, text
+
+from . import models, pagination, rule_sets, rule_history, archive
+
+WorkflowEvent = models.WorkflowEvent
+StructuredRule = models.StructuredRule
+ComplianceDecision = models.ComplianceDecision
+SAMPLE_CURSOR = pagination.encode_cursor(datetime(2026, 1, 1), 1000)
+
+# Each must be served by an index: tests/test_hot_queries.py checks the model
+# schema, explain_hot_queries.py a live database
+HOT_QUERIES = {
+    "latest event per workflow": select(WorkflowEvent).where(
+        WorkflowEvent.workflow_id == "WF-001"
+    ).order_by(WorkflowEvent.submitted_at.desc()).limit(1),
+    "latest structured rule": select(StructuredRule).where(
+        StructuredRule.rule_id == "RULE-001"
+    ).order_by(StructuredRule.created_at.desc(), StructuredRule.id.desc()).limit(1),
+    "replay rule version lookup": select(StructuredRule).where(
+        StructuredRule.rule_id == "RULE-001", StructuredRule.version == "1.0"
+    ),
+    "workflow decision history": select(ComplianceDecision).where(
+        ComplianceDecision.workflow_id == "WF-001"
+    ).order_by(ComplianceDecision.created_at.desc()),
+    "dashboard alerts": select(ComplianceDecision).where(
+        ComplianceDecision.decision == models.DecisionOutcome.NON_COMPLIANT
+    ).order_by(ComplianceDecision.created_at.desc()).limit(5),
+    "dashboard recent audits": select(ComplianceDecision).order_by(
+        ComplianceDecision.created_at.desc()
+    ).limit(10),
+    "workflow events page": pagination.keyset_page(
+        select(WorkflowEvent), WorkflowEvent, WorkflowEvent.submitted_at, SAMPLE_CURSOR, 100
+    ),
+    "decisions page": pagination.keyset_page(
+        select(ComplianceDecision), ComplianceDecision, ComplianceDecision.created_at, SAMPLE_CURSOR, 100
+    ),
+    "decisions violating a rule": pagination.keyset_page(
+        select(ComplianceDecision).join(
+            models.DecisionViolation, models.DecisionViolation.decision_id == ComplianceDecision.id
+        ).where(
+            models.DecisionViolation.rule_id == "RULE-001",
+            models.DecisionViolation.created_at >= datetime(2026, 1, 1)
+        ),
+        ComplianceDecision, models.DecisionViolation.created_at, SAMPLE_CURSOR, 100,
+        models.DecisionViolation.decision_id
+    ),
+    "decisions under a rule set": pagination.keyset_page(
+        select(ComplianceDecision).where(ComplianceDecision.rule_set_id == "0" * 64),
+        ComplianceDecision, ComplianceDecision.created_at, SAMPLE_CURSOR, 100
+    ),
+    "rule set load": rule_sets.rule_set_rules_statement("0" * 64),
+    "rules in force as of": rule_history.as_of_statement(datetime(2026, 1, 1)),
+    "rule version history": rule_history.history_statement("RULE-001"),
+    "archive partitions by id": archive.partitions_statement(ComplianceDecision, ids=[1000]),
+    "archive partitions by workflow": archive.partitions_statement(WorkflowEvent, workflow_ids=["WF-001"]),
+    "latest archived month": archive.latest_month_statement(ComplianceDecision),
+    "rules page": pagination.id_page(
+        select(models.ComplianceRule), models.ComplianceRule, SAMPLE_CURSOR, 100
+    ),
+}
+
+
+def plan_problems(connection, statement):
+    """Return (plan lines, problems) for one statement."""
+    sql = str(statement.compile(connection, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "sqlite":
+        plan = [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+        # Reading back a subquery the plan built itself (from an index) is not a table scan
+        materialized = {line.split()[1] for line in plan if line.startswith("MATERIALIZE")}
+        problems = [
+            line for line in plan
+            if (line.startswith("SCAN") and "INDEX" not in line and line.split()[1] not in materialized)
+            or "TEMP B-TREE" in line
+        ]
+    else:
+        # Tiny tables make the planner prefer seq scans; ask it to prove an index path exists
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = [row[0] for row in connection.execute(text(f"EXPLAIN {sql}"))]
+        problems = [line for line in plan if "Seq Scan" in line or line.strip().startswith("-> Sort")]
+    return plan, problems
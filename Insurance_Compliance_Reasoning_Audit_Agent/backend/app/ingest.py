@@ -0,0 +1,81 @@
+import os
+import json
+from typing import AsyncIterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+
+from . import models, schemas, workflow_state
+
+BULK_INGEST_CHUNK_SIZE = int(os.getenv("BULK_INGEST_CHUNK_SIZE", "1000"))
+BULK_INGEST_MAX_ERRORS = int(os.getenv("BULK_INGEST_MAX_ERRORS", "1000"))
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def ndjson_items(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """
+    (line number, parsed value) for each non-blank line of a streamed NDJSON
+    body, without buffering the whole body. Lines that are not valid JSON
+    yield the JSONDecodeError instead of a value.
+    """
+    line_number, pending = 0, b""
+    async for chunk in stream:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, _parse(line)
+    if pending.strip():
+        yield line_number + 1, _parse(pending)
+
+
+def json_array_items(body: bytes) -> AsyncIterator[Tuple[int, object]]:
+    """
+    (position, value) for each element of a JSON array body, counting from 1.
+    Raises ValueError straight away if the body is not a JSON array.
+    """
+    items = json.loads(body)
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON array of workflow events")
+
+    async def positions():
+        for position, item in enumerate(items, start=1):
+            yield position, item
+    return positions()
+
+
+def _parse(line: bytes):
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        return e
+
+
+def validate(item) -> Tuple[dict, list]:
+    """A row for workflow_events, or the reasons the item cannot be one."""
+    if isinstance(item, json.JSONDecodeError):
+        return None, [{"type": "json_invalid", "loc": [], "msg": f"Invalid JSON: {item.msg} at column {item.colno}"}]
+    try:
+        return schemas.WorkflowEventCreate.model_validate(item).model_dump(), []
+    except ValidationError as e:
+        return None, [
+            {"type": error["type"], "loc": list(error["loc"]), "msg": error["msg"]}
+            for error in e.errors()
+        ]
+
+
+def insert_events(session, rows: List[dict]) -> List[int]:
+    """
+    Insert a chunk of validated events with one multi-row INSERT and fold
+    them into workflow_state, in the caller's transaction. Returns the new
+    ids in order.
+    """
+    table = models.WorkflowEvent.__table__
+    connection = session.connection()
+    inserted = connection.execute(
+        insert(table).returning(*table.c, sort_by_parameter_order=True), rows
+    ).all()
+    workflow_state.record_events(connection, inserted)
+    return [row.id for row in inserted]
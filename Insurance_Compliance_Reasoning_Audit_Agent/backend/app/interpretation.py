@@ -0,0 +1,67 @@
+import re
+import json
+import hashlib
+from typing import Tuple
+from sqlalchemy.orm import Session
+from . import models
+from .agents import PolicyInterpreterAgent, PROMPT_TEMPLATE_VERSION
+
+
+def _enum_value(value) -> str:
+    return getattr(value, "value", value)
+
+
+def interpretation_key(rule: models.ComplianceRule) -> str:
+    """
+    Content address of an interpretation: the normalized rule text together with
+    everything else the interpreter prompt depends on.
+    """
+    normalized_text = re.sub(r"\s+", " ", rule.rule_text).strip().casefold()
+    payload = json.dumps([
+        normalized_text,
+        _enum_value(rule.category),
+        _enum_value(rule.severity),
+        PROMPT_TEMPLATE_VERSION
+    ])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def from_cached(
+    rule: models.ComplianceRule,
+    cached: models.StructuredRule,
+    key: str
+) -> models.StructuredRule:
+    """New structured row for this rule version, reusing a prior interpretation."""
+    return models.StructuredRule(
+        rule_id=rule.rule_id,
+        version=rule.version,
+        applicability_conditions=cached.applicability_conditions,
+        obligations=cached.obligations,
+        exceptions=cached.exceptions,
+        severity=rule.severity,
+        # Point at the same stored output instead of copying it
+        raw_ai_output_inline=cached.raw_ai_output_inline,
+        raw_ai_output_ref=cached.raw_ai_output_ref,
+        content_hash=key
+    )
+
+
+def interpret_rule(
+    db: Session,
+    interpreter: PolicyInterpreterAgent,
+    rule: models.ComplianceRule
+) -> Tuple[models.StructuredRule, bool]:
+    """
+    Build the StructuredRule for a rule, calling the LLM only when no prior
+    interpretation of identical content exists. Returns (row, cache_hit);
+    the row is not added to the session.
+    """
+    key = interpretation_key(rule)
+    cached = db.query(models.StructuredRule).filter(
+        models.StructuredRule.content_hash == key
+    ).order_by(models.StructuredRule.created_at.desc(), models.StructuredRule.id.desc()).first()
+    if cached:
+        return from_cached(rule, cached, key), True
+
+    structured_rule_data = interpreter.interpret(rule)
+    return models.StructuredRule(**structured_rule_data.model_dump(), content_hash=key), False
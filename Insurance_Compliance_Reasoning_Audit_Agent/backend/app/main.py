@@ -1,14 +1,20 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select, func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, defer
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 import logging
 import time
-from . import models, schemas, database, agents, engine
+from . import models, schemas, database, agents, engine, speculative, retrieval, interpretation, pagination, rollups, violations, attribute_search, rule_sets, rule_history, workflow_state, group_commit, archive, ingest, export
+from .database import get_async_db, get_async_read_db
 
 # Configure Logging
 logging.basicConfig(
@@ -21,9 +27,21 @@ logger = logging.getLogger("compliance-audit")
 AI_METRICS = {
     "reasoning_failures": 0,
     "interpretation_failures": 0,
-    "total_audits": 0
+    "total_audits": 0,
+    "speculative_hits": 0,
+    "interpretation_cache_hits": 0
 }
 
+# List endpoints load only what the summary schemas serialize; touching anything else raises
+DECISION_SUMMARY = load_only(
+    models.ComplianceDecision.id,
+    models.ComplianceDecision.workflow_id,
+    models.ComplianceDecision.decision,
+    models.ComplianceDecision.violated_rules,
+    models.ComplianceDecision.created_at,
+    raiseload=True
+)
+
 LATENCY_DATA = []
 RULE_COVERAGE = {}
 START_TIME = time.time()
@@ -59,6 +77,11 @@ SECURITY REVIEW CHECKLIST:
 """
 
 
+@app.on_event("startup")
+def create_attribute_indexes():
+    attribute_search.ensure_attribute_indexes(database.engine)
+
+
 @app.middleware("http")
 async def log_requests(request, call_next):
     start_time = time.time()
@@ -82,6 +105,86 @@ async def log_requests(request, call_next):
 policy_interpreter = agents.PolicyInterpreterAgent()
 compliance_reasoner = agents.ComplianceReasoningAgent()
 decision_engine = engine.DecisionEngine()
+rule_index = retrieval.RuleRetrievalIndex()
+
+
+def _load_rules_for_event(db: Session, event: models.WorkflowEvent):
+    """
+    Return active rules, the latest structured version of each (the rule set
+    in force), the subset relevant to the event (see RuleRetrievalIndex.select)
+    and that subset's versions.
+    """
+    active_rules = db.query(models.ComplianceRule).filter(
+        models.ComplianceRule.status == models.RuleStatus.ACTIVE
+    ).all()
+
+    structured_rules = []
+    for r_id in [r.rule_id for r in active_rules]:
+        s_rule = db.query(models.StructuredRule).filter(
+            models.StructuredRule.rule_id == r_id
+        ).order_by(models.StructuredRule.created_at.desc(), models.StructuredRule.id.desc()).first()
+        if s_rule:
+            structured_rules.append(s_rule)
+
+    selected = rule_index.select(event, active_rules, structured_rules)
+    rule_versions = {r.rule_id: r.version for r in selected}
+    return active_rules, structured_rules, selected, rule_versions
+
+
+def _speculative_evaluate(event_id: int):
+    """Background job: evaluate an event against the current rule set."""
+    db = database.SessionLocal()
+    try:
+        state = workflow_state.state_through(db, db.get(models.WorkflowEvent, event_id))
+        _, rule_set, structured_rules, _ = _load_rules_for_event(db, state)
+        version = speculative.rule_set_version(rule_set)
+        return version, compliance_reasoner.evaluate(state, structured_rules)
+    finally:
+        db.close()
+
+
+speculative_auditor = speculative.SpeculativeAuditor(_speculative_evaluate)
+decision_writer = group_commit.DecisionWriter()
+
+
+def _build_reasoning_trace(ai_evaluation: dict) -> list:
+    """Per-rule reasoning steps, plus a note of any event data withheld from the prompt."""
+    reasoning_trace = [
+        {"rule_id": e["rule_id"], "steps": e["reasoning_steps"]}
+        for e in ai_evaluation.get("evaluations", [])
+    ]
+    projection = ai_evaluation.get("attribute_projection") or {}
+    if projection.get("dropped") or projection.get("truncated"):
+        reasoning_trace.append({
+            "rule_id": "Prompt Projection",
+            "steps": [{
+                "step": "Attribute Projection",
+                "result": f"{len(projection['dropped'])} attribute(s) omitted, "
+                          f"{len(projection['truncated'])} value(s) truncated",
+                "detail": f"Omitted as not referenced by any evaluated rule: "
+                          f"{', '.join(projection['dropped']) or 'none'}. "
+                          f"Truncated: {', '.join(projection['truncated']) or 'none'}."
+            }]
+        })
+    return reasoning_trace
+
+
+def _page_query(build, *args):
+    """Apply a pagination helper, mapping a malformed cursor to a 400."""
+    try:
+        return build(*args)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _with_archived(db: AsyncSession, model, rows, cursor, limit: int, start=None, end=None, matches=None):
+    """Merge archived rows into a newest-first keyset page (see archive.complete_page)."""
+    before = None
+    if cursor is not None:
+        before = pagination.decode_cursor(cursor)
+        if before[0] is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return await db.run_sync(archive.complete_page, model, list(rows), limit, before, start, end, matches)
 
 
 # Dependency
@@ -93,6 +196,7 @@ def get_db():
         db.close()
 
 
+
 # Auth Helpers
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -115,7 +219,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -130,9 +234,10 @@ async def get_current_user(
         token_data = schemas.TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = db.query(models.User).filter(
-        models.User.username == token_data.username
-    ).first()
+    result = await db.execute(
+        select(models.User).where(models.User.username == token_data.username)
+    )
+    user = result.scalars().first()
     if user is None:
         raise credentials_exception
     return user
@@ -142,11 +247,12 @@ async def get_current_user(
 @app.post("/token", response_model=schemas.Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = db.query(models.User).filter(
-        models.User.username == form_data.username
-    ).first()
+    result = await db.execute(
+        select(models.User).where(models.User.username == form_data.username)
+    )
+    user = result.scalars().first()
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -187,26 +293,30 @@ async def get_metrics(current_user: models.User = Depends(get_current_user)):
 
 @app.get("/dashboard/stats", response_model=schemas.DashboardStats)
 async def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    total_audits = db.query(models.ComplianceDecision).count()
-    
-    # Compliance stats
-    stats = {
-        models.DecisionOutcome.COMPLIANT: db.query(models.ComplianceDecision).filter(models.ComplianceDecision.decision == models.DecisionOutcome.COMPLIANT).count(),
-        models.DecisionOutcome.NON_COMPLIANT: db.query(models.ComplianceDecision).filter(models.ComplianceDecision.decision == models.DecisionOutcome.NON_COMPLIANT).count(),
-        models.DecisionOutcome.REQUIRES_REVIEW: db.query(models.ComplianceDecision).filter(models.ComplianceDecision.decision == models.DecisionOutcome.REQUIRES_REVIEW).count(),
-    }
-    
-    recent_audits = db.query(models.ComplianceDecision).order_by(
-        models.ComplianceDecision.created_at.desc()
-    ).limit(10).all()
-    
-    alerts = db.query(models.ComplianceDecision).filter(
-        models.ComplianceDecision.decision == models.DecisionOutcome.NON_COMPLIANT
-    ).order_by(models.ComplianceDecision.created_at.desc()).limit(5).all()
-    
+    # Compliance stats from the rollup table, independent of decision history size
+    stats = {outcome: 0 for outcome in models.DecisionOutcome}
+    result = await db.execute(rollups.outcome_counts_statement())
+    for outcome, count in result.all():
+        stats[outcome] = count or 0
+    total_audits = sum(stats.values())
+
+    result = await db.execute(
+        select(models.ComplianceDecision).options(DECISION_SUMMARY).order_by(
+            models.ComplianceDecision.created_at.desc()
+        ).limit(10)
+    )
+    recent_audits = result.scalars().all()
+
+    result = await db.execute(
+        select(models.ComplianceDecision).options(DECISION_SUMMARY).where(
+            models.ComplianceDecision.decision == models.DecisionOutcome.NON_COMPLIANT
+        ).order_by(models.ComplianceDecision.created_at.desc()).limit(5)
+    )
+    alerts = result.scalars().all()
+
     return {
         "total_audits": total_audits,
         "compliance_stats": stats,
@@ -225,6 +335,7 @@ async def get_system_metrics(
     return {
         "ai_metrics": AI_METRICS,
         "average_latency_ms": avg_latency,
+        "decision_writer": decision_writer.metrics(),
         "rule_coverage": RULE_COVERAGE,
         "uptime_seconds": uptime
     }
@@ -256,50 +367,196 @@ def create_workflow_event(
     db.add(db_event)
     db.commit()
     db.refresh(db_event)
+
+    # Optionally start reasoning now so the eventual audit doesn't wait on the LLM
+    speculative_auditor.submit(db_event.id)
     return db_event
 
 
-@app.get("/workflows/", response_model=List[schemas.WorkflowEvent])
-def read_workflow_events(
-    skip: int = 0,
-    limit: int = 100,
+@app.post("/workflows/bulk", response_model=schemas.BulkIngestResult)
+async def bulk_create_workflow_events(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    events = db.query(models.WorkflowEvent).offset(skip).limit(limit).all()
-    return events
+    """
+    Ingest many events from a streamed NDJSON body (Content-Type:
+    application/x-ndjson) or a JSON array. Valid events are inserted in
+    chunks of BULK_INGEST_CHUNK_SIZE, one transaction each; invalid lines are
+    reported by line number and do not stop the rest.
+    """
+    if request.headers.get("content-type", "").split(";")[0].strip() in ingest.NDJSON_MEDIA_TYPES:
+        items = ingest.ndjson_items(request.stream())
+    else:
+        try:
+            items = ingest.json_array_items(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    received, inserted, errors, truncated = 0, 0, [], False
+    latest = {}
+
+    def report(line: int, reasons: list):
+        nonlocal truncated
+        if len(errors) < ingest.BULK_INGEST_MAX_ERRORS:
+            errors.append(schemas.BulkIngestError(line=line, errors=reasons))
+        else:
+            truncated = True
+
+    def store(rows: list) -> List[int]:
+        try:
+            ids = ingest.insert_events(db, rows)
+            db.commit()
+            return ids
+        except SQLAlchemyError:
+            db.rollback()
+            raise
+
+    async def flush(chunk: list):
+        nonlocal inserted
+        try:
+            # Sync driver in a worker thread: multi-row inserts through the
+            # async SQLite driver pay a thread hop per row
+            ids = await run_in_threadpool(store, [row for _, row in chunk])
+        except SQLAlchemyError as e:
+            logger.error(f"Bulk ingest chunk failed: {str(e)}")
+            for line, _ in chunk:
+                report(line, [{"type": "database_error", "loc": [], "msg": "Event could not be stored"}])
+            return
+        inserted += len(ids)
+        for (_, row), event_id in zip(chunk, ids):
+            latest[row["workflow_id"]] = event_id
+
+    chunk = []
+    async for line, item in items:
+        received += 1
+        row, reasons = ingest.validate(item)
+        if reasons:
+            report(line, reasons)
+            continue
+        chunk.append((line, row))
+        if len(chunk) >= ingest.BULK_INGEST_CHUNK_SIZE:
+            await flush(chunk)
+            chunk = []
+    if chunk:
+        await flush(chunk)
+
+    # Audits read the latest event of a workflow, so only those are worth speculating on
+    for event_id in latest.values():
+        speculative_auditor.submit(event_id)
+    return schemas.BulkIngestResult(
+        received=received, inserted=inserted, errors=errors, errors_truncated=truncated
+    )
+
+
+@app.get("/workflows/", response_model=schemas.Page[schemas.WorkflowEvent])
+async def read_workflow_events(
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    statement = _page_query(
+        pagination.keyset_page, select(models.WorkflowEvent), models.WorkflowEvent,
+        models.WorkflowEvent.submitted_at, cursor, limit
+    )
+    result = await db.execute(statement)
+    rows = await _with_archived(db, models.WorkflowEvent, result.scalars().all(), cursor, limit)
+    return pagination.build_page(rows, limit, "submitted_at")
+
+
+@app.get("/workflows/search", response_model=schemas.Page[schemas.WorkflowEvent])
+async def search_workflow_events(
+    request: Request,
+    workflow_type: Optional[models.WorkflowType] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Find events by attribute values, e.g. ?attr.claim_id=CLM-1&attr.mfa_used=false"""
+    try:
+        filters = attribute_search.parse_filters(request.query_params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not filters:
+        raise HTTPException(status_code=400, detail="At least one attr.<path> filter is required")
+
+    dialect_name = database.async_engine.dialect.name
+    statement = select(models.WorkflowEvent)
+    try:
+        for path, value in filters.items():
+            statement = statement.where(attribute_search.attribute_condition(dialect_name, path, value))
+    except LookupError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if workflow_type is not None:
+        statement = statement.where(models.WorkflowEvent.workflow_type == workflow_type)
+
+    statement = _page_query(
+        pagination.keyset_page, statement, models.WorkflowEvent,
+        models.WorkflowEvent.submitted_at, cursor, limit
+    )
+    result = await db.execute(statement)
+
+    def matches(session, events):
+        return [
+            e for e in events
+            if (workflow_type is None or e.workflow_type == workflow_type)
+            and all(attribute_search.attribute_matches(e.attributes, path, value) for path, value in filters.items())
+        ]
+    rows = await _with_archived(db, models.WorkflowEvent, result.scalars().all(), cursor, limit, matches=matches)
+    return pagination.build_page(rows, limit, "submitted_at")
 
 
 @app.get("/workflows/{workflow_id}", response_model=List[schemas.WorkflowEvent])
-def read_workflow_event(workflow_id: str, db: Session = Depends(get_db)):
-    events = db.query(models.WorkflowEvent).filter(
-        models.WorkflowEvent.workflow_id == workflow_id
-    ).all()
+async def read_workflow_event(workflow_id: str, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(
+        select(models.WorkflowEvent).where(
+            models.WorkflowEvent.workflow_id == workflow_id
+        )
+    )
+    events = await db.run_sync(archive.find_rows, models.WorkflowEvent, workflow_id=workflow_id)
+    events += result.scalars().all()
     if not events:
         raise HTTPException(status_code=404, detail="Workflow events not found")
     return events
 
 
+@app.get("/workflows/{workflow_id}/state", response_model=schemas.WorkflowState)
+async def read_workflow_state(workflow_id: str, db: AsyncSession = Depends(get_async_db)):
+    state = await db.get(models.WorkflowState, workflow_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Workflow events not found")
+    return state
+
+
 @app.post(
     "/workflows/{workflow_id}/audit",
     response_model=schemas.ComplianceDecision
 )
 def audit_workflow(
     workflow_id: str,
+    as_of: Optional[datetime] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    # 1. Get the latest event for this workflow
-    event = db.query(models.WorkflowEvent).filter(
-        models.WorkflowEvent.workflow_id == workflow_id
-    ).order_by(models.WorkflowEvent.submitted_at.desc()).first()
-    if not event:
+    # 1. Get the workflow's state: all of its events folded together (as of the audit time, if given)
+    if as_of is None:
+        state = db.get(models.WorkflowState, workflow_id)
+    else:
+        state = workflow_state.state_as_of(db.connection(), workflow_id, as_of)
+    if not state:
         raise HTTPException(status_code=404, detail="Workflow event not found")
 
     # 2. Get all active rules and their latest structured versions
-    active_rules = db.query(models.ComplianceRule).filter(
-        models.ComplianceRule.status == models.RuleStatus.ACTIVE
-    ).all()
+    if as_of is None:
+        active_rules, rule_set, structured_rules, rule_versions = _load_rules_for_event(db, state)
+    else:
+        # Point-in-time audit: every rule in force then. Retrieval is skipped
+        # because its index reflects the current catalog.
+        structured_rules = rule_history.rules_as_of(db, as_of)
+        active_rules = rule_set = structured_rules
+        rule_versions = {r.rule_id: r.version for r in structured_rules}
     if not active_rules:
         return schemas.ComplianceDecision(
             workflow_id=workflow_id,
@@ -310,22 +567,17 @@ def audit_workflow(
             created_at=datetime.now()
         )
 
-    rule_ids = [r.rule_id for r in active_rules]
-    # Get latest structured rule for each rule_id
-    structured_rules = []
-    rule_versions = {}
-    for r_id in rule_ids:
-        s_rule = db.query(models.StructuredRule).filter(
-            models.StructuredRule.rule_id == r_id
-        ).order_by(models.StructuredRule.created_at.desc()).first()
-        if s_rule:
-            structured_rules.append(s_rule)
-            rule_versions[r_id] = s_rule.version
+    # The snapshot is every rule in force; rule_versions records the ones evaluated
+    rule_set_id = rule_sets.ensure_rule_set(db, rule_set)
 
     # 3. Invoke AI Reasoning Agent
     try:
         AI_METRICS["total_audits"] += 1
-        ai_evaluation = compliance_reasoner.evaluate(event, structured_rules)
+        ai_evaluation = speculative_auditor.claim(state.last_event_id, rule_set_id)
+        if ai_evaluation is None:
+            ai_evaluation = compliance_reasoner.evaluate(state, structured_rules)
+        else:
+            AI_METRICS["speculative_hits"] += 1
 
         # Track rule coverage
         for s_rule in structured_rules:
@@ -342,22 +594,18 @@ def audit_workflow(
             e["rule_id"] for e in ai_evaluation.get("evaluations", [])
             if e["status"] == "NON_COMPLIANT"
         ]
-        reasoning_trace = [
-            {"rule_id": e["rule_id"], "steps": e["reasoning_steps"]}
-            for e in ai_evaluation.get("evaluations", [])
-        ]
+        reasoning_trace = _build_reasoning_trace(ai_evaluation)
 
         db_decision = models.ComplianceDecision(
             workflow_id=workflow_id,
+            workflow_event_id=state.last_event_id,
             decision=decision_outcome,
             violated_rules=violated_rules,
             reasoning_trace=reasoning_trace,
-            rule_versions=rule_versions
+            rule_versions=rule_versions,
+            rule_set_id=rule_set_id
         )
-        db.add(db_decision)
-        db.commit()
-        db.refresh(db_decision)
-        return db_decision
+        return decision_writer.write(db, db_decision)
 
     except Exception as e:
         # AI failures degrade to REQUIRES_REVIEW
@@ -376,80 +624,226 @@ def audit_workflow(
 
         db_decision = models.ComplianceDecision(
             workflow_id=workflow_id,
+            workflow_event_id=state.last_event_id,
             decision=models.DecisionOutcome.REQUIRES_REVIEW,
             violated_rules=[],
             reasoning_trace=reasoning_trace,
-            rule_versions=rule_versions
+            rule_versions=rule_versions,
+            rule_set_id=rule_set_id
         )
-        db.add(db_decision)
-        db.commit()
-        db.refresh(db_decision)
-        return db_decision
+        return decision_writer.write(db, db_decision)
 
 
-@app.get("/decisions/", response_model=List[schemas.ComplianceDecision])
-def get_all_decisions(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+@app.get("/decisions/", response_model=schemas.Page[schemas.ComplianceDecisionSummary])
+async def get_all_decisions(
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    decisions = db.query(models.ComplianceDecision).order_by(
-        models.ComplianceDecision.created_at.desc()
-    ).offset(skip).limit(limit).all()
-    return decisions
+    statement = _page_query(
+        pagination.keyset_page, select(models.ComplianceDecision).options(DECISION_SUMMARY),
+        models.ComplianceDecision, models.ComplianceDecision.created_at, cursor, limit
+    )
+    result = await db.execute(statement)
+    rows = await _with_archived(db, models.ComplianceDecision, result.scalars().all(), cursor, limit)
+    return pagination.build_page(rows, limit, "created_at")
+
+
+@app.get("/decisions/export")
+async def export_decisions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    rule_id: Optional[str] = None,
+    rule_set_id: Optional[str] = None,
+    outcome: Optional[models.DecisionOutcome] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_trace: bool = True,
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Stream every matching decision, archived ones included, oldest first, as
+    NDJSON or CSV, with the rule versions each was made under.
+    """
+    filters = dict(
+        rule_id=rule_id, rule_set_id=rule_set_id, outcome=outcome,
+        created_from=created_from, created_to=created_to, include_trace=include_trace
+    )
+
+    async def body():
+        # The session must outlive the endpoint, so it is opened here rather than injected
+        async with database.AsyncReadSessionLocal() as db:
+            if format == "csv":
+                yield export.csv_header(include_trace)
+            async for batch in export.decision_batches(db, **filters):
+                if format == "csv":
+                    yield export.csv_chunk(batch, include_trace)
+                else:
+                    yield export.ndjson_chunk(batch, include_trace)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"decisions-{datetime.utcnow():%Y%m%dT%H%M%S}.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        body(), media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@app.get("/decisions/search", response_model=schemas.Page[schemas.ComplianceDecisionSummary])
+async def search_decisions(
+    rule_id: Optional[str] = None,
+    rule_set_id: Optional[str] = None,
+    outcome: Optional[models.DecisionOutcome] = None,
+    workflow_type: Optional[models.WorkflowType] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    Decision = models.ComplianceDecision
+    statement = select(Decision).options(DECISION_SUMMARY)
+    if rule_id is not None:
+        # Drive from the violation index; its created_at mirrors the decision's
+        Violation = models.DecisionViolation
+        statement = statement.join(Violation, Violation.decision_id == Decision.id).where(
+            Violation.rule_id == rule_id
+        )
+        sort_column, id_column = Violation.created_at, Violation.decision_id
+    else:
+        sort_column, id_column = Decision.created_at, Decision.id
+
+    if rule_set_id is not None:
+        statement = statement.where(Decision.rule_set_id == rule_set_id)
+    if outcome is not None:
+        statement = statement.where(Decision.decision == outcome)
+    if workflow_type is not None:
+        # The audited event's type, as the rollups count it
+        statement = statement.where(rollups.decision_workflow_type(
+            Decision.workflow_event_id, Decision.workflow_id, Decision.created_at
+        ) == workflow_type)
+    if created_from is not None:
+        statement = statement.where(sort_column >= created_from)
+    if created_to is not None:
+        statement = statement.where(sort_column < created_to)
+
+    statement = _page_query(
+        pagination.keyset_page, statement, Decision, sort_column, cursor, limit, id_column
+    )
+    result = await db.execute(statement)
+
+    def matches(session, decisions):
+        decisions = [
+            d for d in decisions
+            if (rule_id is None or rule_id in (d.violated_rules or []))
+            and (rule_set_id is None or d.rule_set_id == rule_set_id)
+            and (outcome is None or d.decision == outcome)
+        ]
+        if workflow_type is None or not decisions:
+            return decisions
+        types = rollups.workflow_types(session, decisions)
+        return [d for d in decisions if types.get(d.id) == workflow_type]
+    rows = await _with_archived(
+        db, Decision, result.scalars().all(), cursor, limit, created_from, created_to, matches
+    )
+    return pagination.build_page(rows, limit, "created_at")
 
 
 @app.get("/decisions/{workflow_id}", response_model=List[schemas.ComplianceDecision])
-def get_decisions(
+async def get_decisions(
     workflow_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    decisions = db.query(models.ComplianceDecision).filter(
-        models.ComplianceDecision.workflow_id == workflow_id
-    ).order_by(models.ComplianceDecision.created_at.desc()).all()
+    result = await db.execute(
+        select(models.ComplianceDecision).where(
+            models.ComplianceDecision.workflow_id == workflow_id
+        ).order_by(models.ComplianceDecision.created_at.desc())
+    )
+    decisions = result.scalars().all()
+    # Archived decisions are all older than the ones still in the table
+    archived = await db.run_sync(archive.find_rows, models.ComplianceDecision, workflow_id=workflow_id)
+    decisions += sorted(archived, key=lambda d: (d.created_at, d.id), reverse=True)
+    await db.run_sync(models.load_blob_attributes, decisions, "reasoning_trace")
+    await db.run_sync(models.load_rule_versions, decisions)
     return decisions
 
 
-@app.post(
-    "/workflows/{workflow_id}/replay/{decision_id}",
-    response_model=schemas.ComplianceDecision
-)
-def replay_decision(
+@app.get("/decisions/{workflow_id}/{decision_id}", response_model=schemas.ComplianceDecision)
+async def get_decision(
     workflow_id: str,
     decision_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """
-    Replay a specific decision by re-evaluating the same event
-    with the same rule versions.
-    """
-    old_decision = db.query(models.ComplianceDecision).filter(
-        models.ComplianceDecision.id == decision_id
-    ).first()
-    if not old_decision:
+    decision = await db.get(models.ComplianceDecision, decision_id)
+    if decision is None:
+        decision = await db.run_sync(_archived, models.ComplianceDecision, decision_id)
+    if decision is None or decision.workflow_id != workflow_id:
         raise HTTPException(status_code=404, detail="Decision not found")
+    await db.run_sync(models.load_blob_attributes, [decision], "reasoning_trace")
+    await db.run_sync(models.load_rule_versions, [decision])
+    return decision
 
-    # Get the event that was used
-    event = db.query(models.WorkflowEvent).filter(
-        models.WorkflowEvent.workflow_id == workflow_id
+
+def _archived(db: Session, model, row_id: int):
+    """A row moved to the archive, as a transient instance, or None."""
+    rows = archive.find_rows(db, model, ids=[row_id])
+    return rows[0] if rows else None
+
+
+def _audited_event(db: Session, decision: models.ComplianceDecision):
+    if decision.workflow_event_id is None:
+        return _legacy_replay_event(db, decision)
+    event = db.get(models.WorkflowEvent, decision.workflow_event_id)
+    if event is None:
+        event = _archived(db, models.WorkflowEvent, decision.workflow_event_id)
+    return event
+
+
+def _legacy_replay_event(db: Session, decision: models.ComplianceDecision):
+    """Best guess for decisions recorded before workflow_event_id: the latest event submitted before it."""
+    return db.query(models.WorkflowEvent).filter(
+        models.WorkflowEvent.workflow_id == decision.workflow_id
     ).filter(
-        models.WorkflowEvent.submitted_at <= old_decision.created_at
+        models.WorkflowEvent.submitted_at <= decision.created_at
     ).order_by(models.WorkflowEvent.submitted_at.desc()).first()
 
-    # Get the specific rule versions used
-    structured_rules = []
-    for r_id, version in old_decision.rule_versions.items():
-        s_rule = db.query(models.StructuredRule).filter(
-            models.StructuredRule.rule_id == r_id
-        ).filter(models.StructuredRule.version == version).first()
-        if s_rule:
-            structured_rules.append(s_rule)
 
-    # Re-run reasoning
-    ai_evaluation = compliance_reasoner.evaluate(event, structured_rules)
+def _replay(
+    db: Session,
+    old_decision: models.ComplianceDecision,
+    event: models.WorkflowEvent,
+    snapshots: Optional[Dict[str, list]] = None
+) -> models.ComplianceDecision:
+    """Re-evaluate an event with the rule versions of an earlier decision; the result is not yet added."""
+    snapshots = {} if snapshots is None else snapshots
+
+    # Get the specific rule versions used
+    if old_decision.rule_set_id is not None:
+        rule_set_id = old_decision.rule_set_id
+        if rule_set_id not in snapshots:
+            snapshots[rule_set_id] = rule_sets.load_rule_set(db, rule_set_id)
+        # Only the rules the decision evaluated, not the whole snapshot
+        structured_rules = [
+            r for r in snapshots[rule_set_id]
+            if old_decision.rule_versions.get(r.rule_id) == r.version
+        ]
+    else:
+        # Decisions made before rule-set snapshots only recorded versions
+        structured_rules = []
+        for r_id, version in old_decision.rule_versions.items():
+            s_rule = db.query(models.StructuredRule).filter(
+                models.StructuredRule.rule_id == r_id
+            ).filter(models.StructuredRule.version == version).first()
+            if s_rule:
+                structured_rules.append(s_rule)
+        rule_set_id = rule_sets.ensure_rule_set(db, structured_rules)
+
+    # Re-run reasoning on the workflow as it stood right after that event
+    state = workflow_state.state_through(db, event)
+    ai_evaluation = compliance_reasoner.evaluate(state, structured_rules)
     rule_severities = {r.rule_id: r.severity for r in structured_rules}
     decision_outcome = decision_engine.decide(
         ai_evaluation.get("evaluations", []),
@@ -460,24 +854,99 @@ def replay_decision(
         e["rule_id"] for e in ai_evaluation.get("evaluations", [])
         if e["status"] == "NON_COMPLIANT"
     ]
-    reasoning_trace = [
-        {"rule_id": e["rule_id"], "steps": e["reasoning_steps"]}
-        for e in ai_evaluation.get("evaluations", [])
-    ]
+    reasoning_trace = _build_reasoning_trace(ai_evaluation)
 
     new_decision = models.ComplianceDecision(
-        workflow_id=workflow_id,
+        workflow_id=old_decision.workflow_id,
+        workflow_event_id=event.id,
         decision=decision_outcome,
         violated_rules=violated_rules,
         reasoning_trace=reasoning_trace,
-        rule_versions=old_decision.rule_versions
+        rule_versions=old_decision.rule_versions,
+        rule_set_id=rule_set_id
     )
-    db.add(new_decision)
-    db.commit()
-    db.refresh(new_decision)
     return new_decision
 
 
+@app.post(
+    "/workflows/{workflow_id}/replay/{decision_id}",
+    response_model=schemas.ComplianceDecision
+)
+def replay_decision(
+    workflow_id: str,
+    decision_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Replay a specific decision by re-evaluating the same event
+    with the same rule versions.
+    """
+    old_decision = db.get(models.ComplianceDecision, decision_id)
+    if old_decision is None:
+        old_decision = _archived(db, models.ComplianceDecision, decision_id)
+        if old_decision is not None:
+            models.load_rule_versions(db, [old_decision])
+    if not old_decision or old_decision.workflow_id != workflow_id:
+        raise HTTPException(status_code=404, detail="Decision not found")
+
+    # Get the event that was used
+    event = _audited_event(db, old_decision)
+    if not event:
+        raise HTTPException(status_code=404, detail="Workflow event not found")
+
+    return decision_writer.write(db, _replay(db, old_decision, event))
+
+
+@app.post("/decisions/replay", response_model=List[schemas.ComplianceDecision])
+def replay_decisions(
+    request: schemas.ReplayRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Replay several decisions in one transaction. Decisions and the events they
+    audited are loaded with a single join; rule-set snapshots shared between
+    decisions are loaded once.
+    """
+    decision_ids = list(dict.fromkeys(request.decision_ids))
+    if len(decision_ids) > pagination.MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {pagination.MAX_PAGE_SIZE} decisions can be replayed at once"
+        )
+
+    rows = db.execute(
+        select(models.ComplianceDecision, models.WorkflowEvent).outerjoin(
+            models.WorkflowEvent,
+            models.WorkflowEvent.id == models.ComplianceDecision.workflow_event_id
+        ).where(models.ComplianceDecision.id.in_(decision_ids))
+    ).all()
+    found = {decision.id: (decision, event) for decision, event in rows}
+    archived = archive.find_rows(db, models.ComplianceDecision, ids=[i for i in decision_ids if i not in found])
+    models.load_rule_versions(db, archived)
+    found.update({decision.id: (decision, None) for decision in archived})
+    missing = [i for i in decision_ids if i not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Decisions not found: {missing}")
+
+    snapshots = {}
+    new_decisions = []
+    for decision_id in decision_ids:
+        old_decision, event = found[decision_id]
+        if event is None:
+            event = _audited_event(db, old_decision)
+        if event is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Workflow event not found for decision {decision_id}"
+            )
+        new_decisions.append(_replay(db, old_decision, event, snapshots))
+    db.add_all(new_decisions)
+    db.commit()
+    return new_decisions
+
+
 # Compliance Rules CRUD
 @app.post(
     "/rules/",
@@ -495,11 +964,14 @@ def create_compliance_rule(
     db.commit()
     db.refresh(db_rule)
 
-    # 2. Invoke AI to interpret the rule
+    # 2. Invoke AI to interpret the rule (unless identical content was already interpreted)
     try:
-        structured_rule_data = policy_interpreter.interpret(db_rule)
-        db_structured_rule = models.StructuredRule(**structured_rule_data.model_dump())
+        db_structured_rule, cache_hit = interpretation.interpret_rule(db, policy_interpreter, db_rule)
+        if cache_hit:
+            AI_METRICS["interpretation_cache_hits"] += 1
         db.add(db_structured_rule)
+        db.flush()
+        rule_history.record(db, db_rule, db_structured_rule)
         db.commit()
     except Exception as e:
         # If AI interpretation fails, we might want to rollback
@@ -515,33 +987,99 @@ def create_compliance_rule(
     return db_rule
 
 
-@app.get("/rules/", response_model=List[schemas.ComplianceRule])
-def read_compliance_rules(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+@app.get("/rules/", response_model=schemas.Page[schemas.ComplianceRule])
+async def read_compliance_rules(
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    rules = db.query(models.ComplianceRule).offset(skip).limit(limit).all()
-    return rules
+    # The rule catalog is small and has no insertion timestamp; page by id
+    statement = _page_query(
+        pagination.id_page, select(models.ComplianceRule), models.ComplianceRule, cursor, limit
+    )
+    result = await db.execute(statement)
+    return pagination.build_page(result.scalars().all(), limit)
 
 
 @app.get("/rules/{rule_id}", response_model=schemas.ComplianceRule)
-def read_compliance_rule(rule_id: str, db: Session = Depends(get_db)):
-    rule = db.query(models.ComplianceRule).filter(
-        models.ComplianceRule.rule_id == rule_id
-    ).first()
+async def read_compliance_rule(rule_id: str, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(
+        select(models.ComplianceRule).where(
+            models.ComplianceRule.rule_id == rule_id
+        )
+    )
+    rule = result.scalars().first()
     if rule is None:
         raise HTTPException(status_code=404, detail="Rule not found")
     return rule
 
 
 @app.get("/rules/{rule_id}/structured", response_model=List[schemas.StructuredRule])
-def read_structured_rules(rule_id: str, db: Session = Depends(get_db)):
-    rules = db.query(models.StructuredRule).filter(
-        models.StructuredRule.rule_id == rule_id
-    ).all()
-    return rules
+async def read_structured_rules(rule_id: str, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(
+        select(models.StructuredRule).options(
+            defer(models.StructuredRule.raw_ai_output_inline, raiseload=True),
+            defer(models.StructuredRule.raw_ai_output_ref, raiseload=True),
+            defer(models.StructuredRule.content_hash, raiseload=True)
+        ).where(
+            models.StructuredRule.rule_id == rule_id
+        ).order_by(models.StructuredRule.created_at, models.StructuredRule.id)
+    )
+    return result.scalars().all()
+
+
+@app.get("/rules/{rule_id}/structured/{structured_id}", response_model=schemas.StructuredRuleDetail)
+async def read_structured_rule(
+    rule_id: str,
+    structured_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    structured_rule = await db.get(models.StructuredRule, structured_id)
+    if structured_rule is None or structured_rule.rule_id != rule_id:
+        raise HTTPException(status_code=404, detail="Structured rule not found")
+    await db.run_sync(models.load_blob_attributes, [structured_rule], "raw_ai_output")
+    return structured_rule
+
+
+@app.get("/rules/{rule_id}/history", response_model=List[schemas.RuleVersion])
+async def read_rule_history(rule_id: str, db: AsyncSession = Depends(get_async_read_db)):
+    result = await db.execute(rule_history.history_statement(rule_id))
+    return result.scalars().all()
+
+
+@app.get("/rule-versions/", response_model=List[schemas.StructuredRule])
+async def read_rules_as_of(
+    as_of: datetime,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Structured rule versions in force at a point in time."""
+    result = await db.execute(
+        rule_history.as_of_statement(as_of).options(
+            defer(models.StructuredRule.raw_ai_output_inline, raiseload=True),
+            defer(models.StructuredRule.raw_ai_output_ref, raiseload=True)
+        )
+    )
+    return sorted(result.scalars(), key=lambda r: r.rule_id)
+
+
+@app.get("/rule-sets/{rule_set_id}", response_model=schemas.RuleSet)
+async def read_rule_set(
+    rule_set_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    rule_set = await db.get(models.RuleSet, rule_set_id)
+    if rule_set is None:
+        raise HTTPException(status_code=404, detail="Rule set not found")
+    result = await db.execute(
+        rule_sets.rule_set_rules_statement(rule_set_id).options(
+            defer(models.StructuredRule.raw_ai_output_inline, raiseload=True),
+            defer(models.StructuredRule.raw_ai_output_ref, raiseload=True)
+        )
+    )
+    return {"id": rule_set.id, "created_at": rule_set.created_at, "rules": result.scalars().all()}
 
 
 @app.put("/rules/{rule_id}", response_model=schemas.ComplianceRule)
@@ -568,11 +1106,14 @@ def update_compliance_rule(
     db.commit()
     db.refresh(db_rule)
 
-    # Re-interpret the rule
+    # Re-interpret the rule; status-only edits and unchanged text hit the cache
     try:
-        structured_rule_data = policy_interpreter.interpret(db_rule)
-        db_structured_rule = models.StructuredRule(**structured_rule_data.model_dump())
+        db_structured_rule, cache_hit = interpretation.interpret_rule(db, policy_interpreter, db_rule)
+        if cache_hit:
+            AI_METRICS["interpretation_cache_hits"] += 1
         db.add(db_structured_rule)
+        db.flush()
+        rule_history.record(db, db_rule, db_structured_rule)
         db.commit()
     except Exception as e:
         # Rollback rule update
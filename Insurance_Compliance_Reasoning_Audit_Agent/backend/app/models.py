@@ -1,7 +1,11 @@
 import enum
-from sqlalchemy import Column, String, DateTime, JSON, Enum, Text, Integer, event
+import json
+from sqlalchemy import Column, String, Date, DateTime, JSON, Enum, Text, Integer, LargeBinary, Index, event, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import object_session
 from sqlalchemy.sql import func
 from .database import Base
+from . import blobs
 
 
 class WorkflowType(str, enum.Enum):
@@ -30,21 +34,114 @@ class DecisionOutcome(str, enum.Enum):
     NON_COMPLIANT = "NON_COMPLIANT"
     REQUIRES_REVIEW = "REQUIRES_REVIEW"
 
+class BlobBacked:
+    """
+    Attribute kept inline on legacy rows and in content_blobs on new ones.
+
+    `inline` and `refs` name the mapped columns. With `per_item` the value is a
+    list stored as one blob per item (so identical reasoning steps are shared
+    across decisions) and `refs` holds the ordered hashes; otherwise the value
+    is text stored as a single blob. Reads decompress on first access through
+    a sync session; async callers batch-load with load_blob_attributes().
+    """
+
+    def __init__(self, inline: str, refs: str, per_item: bool):
+        self.inline = inline
+        self.refs = refs
+        self.per_item = per_item
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.key = f"_{name}_value"
+
+    def __get__(self, obj, owner):
+        if obj is None:
+            return self
+        if self.key not in obj.__dict__:
+            inline = getattr(obj, self.inline)
+            refs = getattr(obj, self.refs)
+            if inline is not None or refs is None:
+                obj.__dict__[self.key] = inline
+            else:
+                payloads = blobs.get_many(
+                    object_session(obj).connection(), ContentBlob.__table__, self.hashes(refs)
+                )
+                obj.__dict__[self.key] = self.decode(refs, payloads)
+        return obj.__dict__[self.key]
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.key] = value
+
+    def hashes(self, refs) -> list:
+        return list(refs) if self.per_item else [refs]
+
+    def decode(self, refs, payloads):
+        if self.per_item:
+            return [json.loads(payloads[h]) for h in refs]
+        return payloads[refs].decode()
+
+    def store(self, connection, obj) -> None:
+        """Move a value assigned before insert into content_blobs."""
+        value = obj.__dict__.get(self.key)
+        if value is None or getattr(obj, self.inline) is not None or getattr(obj, self.refs) is not None:
+            return
+        if self.per_item:
+            payloads = [blobs.encode_json(item) for item in value]
+            setattr(obj, self.refs, blobs.put_many(connection, ContentBlob.__table__, payloads))
+        else:
+            setattr(obj, self.refs, blobs.put_many(connection, ContentBlob.__table__, [value.encode()])[0])
+
+
+class ContentBlob(Base):
+    __tablename__ = "content_blobs"
+
+    # Append-only, content-addressed (sha256 of the uncompressed payload)
+    hash = Column(String(64), primary_key=True)
+    encoding = Column(String, nullable=False)
+    size = Column(Integer, nullable=False) # Uncompressed bytes
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
 class WorkflowEvent(Base):
     __tablename__ = "workflow_events"
 
-    id = Column(Integer, primary_key=True, index=True)
-    workflow_id = Column(String, index=True, nullable=False)
+    id = Column(Integer, primary_key=True)
+    workflow_id = Column(String, nullable=False)
     workflow_type = Column(Enum(WorkflowType), nullable=False)
-    attributes = Column(JSON, nullable=False)
+    attributes = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
     actor_id = Column(String, nullable=False)
     source_system = Column(String, nullable=False)
     submitted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        # Latest event per workflow
+        Index("ix_workflow_events_workflow_id_submitted_at", workflow_id, submitted_at.desc()),
+        # Keyset pagination of /workflows/
+        Index("ix_workflow_events_submitted_at_id", submitted_at.desc(), id.desc()),
+        # Attribute containment search on Postgres (SQLite uses app.attribute_search indexes)
+        Index(
+            "ix_workflow_events_attributes", attributes,
+            postgresql_using="gin", postgresql_ops={"attributes": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+
+class WorkflowState(Base):
+    __tablename__ = "workflow_state"
+
+    # All events of a workflow folded into one snapshot; maintained by app.workflow_state
+    workflow_id = Column(String, primary_key=True)
+    workflow_type = Column(Enum(WorkflowType), nullable=False) # Of the latest event
+    attributes = Column(JSON, nullable=False) # Merged; later events win per key
+    actor_id = Column(String, nullable=False) # Of the latest event
+    source_system = Column(String, nullable=False) # Of the latest event
+    event_count = Column(Integer, nullable=False)
+    last_event_id = Column(Integer, nullable=False)
+    last_submitted_at = Column(DateTime(timezone=True), nullable=False)
+
 class ComplianceRule(Base):
     __tablename__ = "compliance_rules"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     rule_id = Column(String, index=True, nullable=False)
     category = Column(Enum(RuleCategory), nullable=False)
     rule_text = Column(Text, nullable=False)
@@ -56,31 +153,162 @@ class ComplianceRule(Base):
 class StructuredRule(Base):
     __tablename__ = "structured_rules"
 
-    id = Column(Integer, primary_key=True, index=True)
-    rule_id = Column(String, index=True, nullable=False)
+    id = Column(Integer, primary_key=True)
+    rule_id = Column(String, nullable=False)
     version = Column(String, nullable=False)
     applicability_conditions = Column(JSON, nullable=False)
     obligations = Column(JSON, nullable=False)
     exceptions = Column(JSON, nullable=False)
     severity = Column(Enum(RuleSeverity), nullable=False)
-    raw_ai_output = Column(Text, nullable=True)
+    raw_ai_output_inline = Column("raw_ai_output", Text, nullable=True) # Legacy rows only
+    raw_ai_output_ref = Column(String(64), nullable=True) # content_blobs hash
+    raw_ai_output = BlobBacked("raw_ai_output_inline", "raw_ai_output_ref", per_item=False)
+    content_hash = Column(String, index=True, nullable=True) # Interpretation cache key
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        # Latest structured version of a rule; id breaks ties within a timestamp tick
+        Index("ix_structured_rules_rule_id_created_at", rule_id, created_at.desc(), id.desc()),
+        # Replay lookup of an exact version
+        Index("ix_structured_rules_rule_id_version", rule_id, version),
+    )
+
+class RuleVersionHistory(Base):
+    __tablename__ = "rule_version_history"
+
+    # Interval during which a structured version was the one in force for an active rule;
+    # maintained by app.rule_history
+    id = Column(Integer, primary_key=True)
+    rule_id = Column(String, nullable=False)
+    version = Column(String, nullable=False)
+    structured_rule_id = Column(Integer, nullable=False)
+    valid_from = Column(DateTime(timezone=True), nullable=False)
+    valid_to = Column(DateTime(timezone=True), nullable=True) # Open while in force
+
+    __table_args__ = (
+        # As-of lookup of the rules in force at a point in time
+        Index("ix_rule_version_history_valid_from_valid_to", valid_from, valid_to),
+        # Version history of a rule, and its open interval
+        Index("ix_rule_version_history_rule_id_valid_from", rule_id, valid_from.desc()),
+    )
+
+class RuleSet(Base):
+    __tablename__ = "rule_sets"
+
+    # sha256 of the member StructuredRule ids (see speculative.rule_set_version)
+    id = Column(String(64), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class RuleSetMember(Base):
+    __tablename__ = "rule_set_members"
+
+    rule_set_id = Column(String(64), primary_key=True)
+    structured_rule_id = Column(Integer, primary_key=True)
+
 class ComplianceDecision(Base):
     __tablename__ = "compliance_decisions"
 
-    id = Column(Integer, primary_key=True, index=True)
-    workflow_id = Column(String, index=True, nullable=False)
+    id = Column(Integer, primary_key=True)
+    workflow_id = Column(String, nullable=False)
+    workflow_event_id = Column(Integer, nullable=True) # WorkflowEvent that was audited
     decision = Column(Enum(DecisionOutcome), nullable=False)
     violated_rules = Column(JSON, nullable=False) # List of rule_ids
-    reasoning_trace = Column(JSON, nullable=False) # List of reasoning steps
-    rule_versions = Column(JSON, nullable=False) # Map of rule_id to version
+    reasoning_trace_inline = Column("reasoning_trace", JSON, nullable=True) # Legacy rows only
+    reasoning_trace_refs = Column(JSON, nullable=True) # content_blobs hash per reasoning step
+    reasoning_trace = BlobBacked("reasoning_trace_inline", "reasoning_trace_refs", per_item=True)
+    rule_versions_inline = Column("rule_versions", JSON, nullable=True) # Rules evaluated; a subset of the snapshot
+    rule_set_id = Column(String(64), nullable=True) # Rule-set snapshot in force when decided
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    @property
+    def rule_versions(self):
+        """Map of rule_id to version of the rules evaluated; rows that did not store it take the snapshot's."""
+        if "_rule_versions_value" not in self.__dict__:
+            if self.rule_versions_inline is not None or self.rule_set_id is None:
+                self.__dict__["_rule_versions_value"] = self.rule_versions_inline
+            else:
+                versions = rule_set_versions(object_session(self), [self.rule_set_id])
+                self.__dict__["_rule_versions_value"] = versions.get(self.rule_set_id, {})
+        return self.__dict__["_rule_versions_value"]
+
+    @rule_versions.setter
+    def rule_versions(self, value):
+        self.__dict__["_rule_versions_value"] = value
+
+    __table_args__ = (
+        # Decisions made under a rule set
+        Index("ix_compliance_decisions_rule_set_id_created_at", rule_set_id, created_at.desc(), id.desc()),
+        # Decision history of a workflow
+        Index("ix_compliance_decisions_workflow_id_created_at", workflow_id, created_at.desc()),
+        # Dashboard alerts / outcome counts
+        Index("ix_compliance_decisions_decision_created_at", decision, created_at.desc()),
+        # Recent audits and keyset pagination of /decisions/
+        Index("ix_compliance_decisions_created_at_id", created_at.desc(), id.desc()),
+    )
+
+class ArchivePartition(Base):
+    __tablename__ = "archive_partitions"
+
+    # One month of rows moved out of a hot table into a compressed, read-only file (app.archive)
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String, nullable=False)
+    month = Column(Date, nullable=False)
+    path = Column(String, nullable=False, unique=True) # Relative to ARCHIVE_DIR
+    sha256 = Column(String(64), nullable=False) # Of the file as written
+    row_count = Column(Integer, nullable=False)
+    min_id = Column(Integer, nullable=False)
+    max_id = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        # Partitions that may hold a given row id
+        Index("ix_archive_partitions_table_name_min_id", table_name, min_id),
+        # Latest archived month per table
+        Index("ix_archive_partitions_table_name_month", table_name, month.desc()),
+    )
+
+class ArchivePartitionWorkflow(Base):
+    __tablename__ = "archive_partition_workflows"
+
+    # Which archive partitions hold rows of a workflow
+    workflow_id = Column(String, primary_key=True)
+    partition_id = Column(Integer, primary_key=True)
+
+class LoadCheckpoint(Base):
+    __tablename__ = "load_checkpoints"
+
+    # Rows of a source file already loaded by load_workflow_events.py, committed with them
+    source = Column(String, primary_key=True)
+    rows_done = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+class DecisionRollup(Base):
+    __tablename__ = "decision_rollups"
+
+    # Decision counts per day, workflow type and outcome; maintained by app.rollups
+    day = Column(Date, primary_key=True)
+    workflow_type = Column(Enum(WorkflowType), primary_key=True)
+    decision = Column(Enum(DecisionOutcome), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class DecisionViolation(Base):
+    __tablename__ = "decision_violations"
+
+    # One row per violated rule of a decision; written by app.violations
+    decision_id = Column(Integer, primary_key=True)
+    rule_id = Column(String, primary_key=True)
+    severity = Column(Enum(RuleSeverity), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # Decisions that violated a rule in a date range, newest first
+        Index("ix_decision_violations_rule_id_created_at", rule_id, created_at.desc(), decision_id.desc()),
+    )
+
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     username = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(DateTime(timezone=True), server_default=func.now())
@@ -96,6 +324,86 @@ def prevent_delete(mapper, connection, target):
 
 
 # Register listeners for immutable models
-for model in [WorkflowEvent, ComplianceDecision, StructuredRule]:
+for model in [
+    WorkflowEvent, ComplianceDecision, StructuredRule, DecisionViolation, ContentBlob,
+    RuleSet, RuleSetMember, ArchivePartition, ArchivePartitionWorkflow
+]:
     event.listen(model, 'before_update', prevent_update)
     event.listen(model, 'before_delete', prevent_delete)
+
+
+# Blob-backed attributes
+def _blob_attributes(model) -> list:
+    return [v for v in vars(model).values() if isinstance(v, BlobBacked)]
+
+
+def store_blobs(mapper, connection, target):
+    for attribute in _blob_attributes(type(target)):
+        attribute.store(connection, target)
+
+
+def load_blob_attributes(session, objects, name: str) -> None:
+    """
+    Resolve a BlobBacked attribute for many rows with one blob query. Pass as
+    AsyncSession.run_sync(load_blob_attributes, objects, name) from async code.
+    """
+    pending = [o for o in objects if getattr(type(o), name).key not in o.__dict__]
+    if not pending:
+        return
+    attribute = getattr(type(pending[0]), name)
+    hashes = [
+        h for o in pending
+        if getattr(o, attribute.inline) is None and getattr(o, attribute.refs) is not None
+        for h in attribute.hashes(getattr(o, attribute.refs))
+    ]
+    payloads = blobs.get_many(session.connection(), ContentBlob.__table__, hashes)
+    for o in pending:
+        inline, refs = getattr(o, attribute.inline), getattr(o, attribute.refs)
+        o.__dict__[attribute.key] = inline if inline is not None or refs is None else attribute.decode(refs, payloads)
+
+
+for model in [ComplianceDecision, StructuredRule]:
+    event.listen(model, 'before_insert', store_blobs)
+
+
+
+# Rule-set snapshots
+def rule_set_versions(session, rule_set_ids) -> dict:
+    """{rule_set_id: {rule_id: version}} for the given snapshots, in one query."""
+    versions = {rule_set_id: {} for rule_set_id in rule_set_ids}
+    if not versions:
+        return versions
+    rows = session.execute(
+        select(RuleSetMember.rule_set_id, StructuredRule.rule_id, StructuredRule.version)
+        .join(StructuredRule, StructuredRule.id == RuleSetMember.structured_rule_id)
+        .where(RuleSetMember.rule_set_id.in_(list(versions)))
+        .order_by(StructuredRule.rule_id)
+    )
+    for rule_set_id, rule_id, version in rows:
+        versions[rule_set_id][rule_id] = version
+    return versions
+
+
+def load_rule_versions(session, decisions, cache: dict = None) -> None:
+    """
+    Batch-resolve ComplianceDecision.rule_versions; use via AsyncSession.run_sync.
+    Snapshots already in the optional cache dict are not queried again.
+    """
+    pending = [
+        d for d in decisions
+        if "_rule_versions_value" not in d.__dict__
+        and d.rule_versions_inline is None and d.rule_set_id is not None
+    ]
+    versions = {} if cache is None else cache
+    versions.update(rule_set_versions(session, {d.rule_set_id for d in pending} - versions.keys()))
+    for d in pending:
+        d.__dict__["_rule_versions_value"] = versions[d.rule_set_id]
+
+
+def keep_rule_versions(mapper, connection, target):
+    # The snapshot holds every rule in force; only the decision knows which it evaluated
+    if target.rule_versions_inline is None:
+        target.rule_versions_inline = target.__dict__.get("_rule_versions_value") or {}
+
+
+event.listen(ComplianceDecision, 'before_insert', keep_rule_versions)
\ No newline at end of file
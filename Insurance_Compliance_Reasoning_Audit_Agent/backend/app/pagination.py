@@ -0,0 +1,69 @@
+import json
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import select, tuple_, func
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if sort_value is not None:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_page(statement, model, sort_column, cursor: Optional[str], limit: int, id_column=None):
+    """
+    Order a select newest-first on (sort_column, id) and seek past the cursor.
+
+    The cursor row's stored sort value is re-read by id rather than trusting
+    the decoded timestamp, so the comparison is made against exactly what the
+    database holds (SQLite keeps server-default timestamps without
+    microseconds, which would not compare equal to a bound datetime). The
+    decoded value is only a fallback if that row is gone. id_column defaults
+    to the model's primary key.
+    """
+    id_column = model.id if id_column is None else id_column
+    statement = statement.order_by(sort_column.desc(), id_column.desc())
+    if cursor is not None:
+        sort_value, row_id = decode_cursor(cursor)
+        anchor = select(sort_column).where(id_column == row_id).limit(1).correlate(None).scalar_subquery()
+        statement = statement.where(
+            tuple_(sort_column, id_column) < tuple_(func.coalesce(anchor, sort_value), row_id)
+        )
+    return statement.limit(limit + 1)
+
+
+def id_page(statement, model, cursor: Optional[str], limit: int):
+    """Order a select by primary key ascending and seek past the cursor."""
+    statement = statement.order_by(model.id)
+    if cursor is not None:
+        _, row_id = decode_cursor(cursor)
+        statement = statement.where(model.id > row_id)
+    return statement.limit(limit + 1)
+
+
+def build_page(rows, limit: int, sort_attr: Optional[str] = None) -> dict:
+    """Trim the look-ahead row and derive next_cursor from the last row kept."""
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_attr) if sort_attr else None, last.id)
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,92 @@
+import os
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+PROMPT_MAX_STRING_CHARS = int(os.getenv("PROMPT_MAX_STRING_CHARS", "500"))
+# Off: every attribute key is sent and only long strings are cut
+PROMPT_DROP_ATTRIBUTES = os.getenv("PROMPT_DROP_ATTRIBUTES", "true").lower() in ("1", "true", "yes")
+# Keys sent whatever the rules name
+PROMPT_KEEP_ATTRIBUTES = {
+    k.strip() for k in os.getenv("PROMPT_KEEP_ATTRIBUTES", "").split(",") if k.strip()
+}
+
+
+def _rule_text(rule) -> str:
+    return " ".join(
+        str(item)
+        for field in (rule.applicability_conditions, rule.obligations, rule.exceptions)
+        for item in (field or [])
+    )
+
+
+def _names_key(text: str, key: str) -> bool:
+    """Whether the text uses the attribute key itself, e.g. claim_id, not just related words."""
+    return re.search(rf"(?<!\w){re.escape(key)}(?!\w)", text, re.IGNORECASE) is not None
+
+
+def _named_keys(attributes: Dict[str, Any], rules: list) -> Optional[Set[str]]:
+    """
+    The attribute keys the rules' structured fields name, or None if any rule
+    names none of them: a rule written only in prose ("multi-factor
+    authentication") may need any key, so none can be ruled out.
+    """
+    named = set()
+    for rule in rules:
+        text = _rule_text(rule)
+        keys = {k for k in attributes if _names_key(text, k)}
+        if not keys:
+            return None
+        named |= keys
+    return named
+
+
+def _truncate(value: Any, max_chars: int, path: str, truncated: List[str]) -> Any:
+    if isinstance(value, str):
+        if len(value) > max_chars:
+            truncated.append(path)
+            return value[:max_chars] + f"...[truncated {len(value) - max_chars} chars]"
+        return value
+    if isinstance(value, dict):
+        return {
+            k: _truncate(v, max_chars, f"{path}.{k}", truncated)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [
+            _truncate(v, max_chars, f"{path}[{i}]", truncated)
+            for i, v in enumerate(value)
+        ]
+    return value
+
+
+def project_attributes(
+    attributes: Dict[str, Any],
+    rules: list,
+    max_string_chars: int = PROMPT_MAX_STRING_CHARS,
+    drop: bool = PROMPT_DROP_ATTRIBUTES,
+    always_keep: Set[str] = PROMPT_KEEP_ATTRIBUTES
+) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    """
+    Reduce event attributes to the keys the selected structured rules name
+    and cap long strings, so the reasoning prompt only carries relevant context.
+
+    Returns the projected attributes and a report of what was dropped/truncated.
+    A key is only dropped when every rule names the keys it uses and none names
+    this one; keys in always_keep are never dropped. If nothing would be left,
+    all keys are kept (truncation still applies).
+    """
+    named = _named_keys(attributes, rules) if drop else None
+    if named is None:
+        kept = list(attributes)
+    else:
+        kept = [k for k in attributes if k in named or k in always_keep]
+    if not kept:
+        kept = list(attributes)
+    dropped = [k for k in attributes if k not in kept]
+
+    truncated: List[str] = []
+    projected = {
+        k: _truncate(attributes[k], max_string_chars, k, truncated)
+        for k in kept
+    }
+    return projected, {"kept": kept, "dropped": dropped, "truncated": truncated}
@@ -0,0 +1,148 @@
+import os
+import re
+import zlib
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "20"))
+RETRIEVAL_MANDATORY_RULES = {
+    r.strip() for r in os.getenv("RETRIEVAL_MANDATORY_RULES", "").split(",") if r.strip()
+}
+N_FEATURES = 2 ** 18
+MAX_VALUE_CHARS = 200
+
+
+def _tokens(text: str) -> List[str]:
+    spaced = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", " ", text)
+    return re.findall(r"[a-z0-9]+", spaced.lower())
+
+
+def _hashed_features(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash word unigrams and bigrams into a fixed feature space.
+    crc32 is used instead of hash() so indices are stable across processes.
+    """
+    tokens = _tokens(text)
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not grams:
+        grams = ["<empty>"]
+    hashed = np.fromiter(
+        (zlib.crc32(g.encode()) % N_FEATURES for g in grams),
+        dtype=np.int64,
+        count=len(grams)
+    )
+    indices, counts = np.unique(hashed, return_counts=True)
+    return indices, counts.astype(np.float32)
+
+
+def rule_document(rule_text: str, structured_rule) -> str:
+    return " ".join(
+        [structured_rule.rule_id, rule_text or ""]
+        + [str(c) for c in structured_rule.applicability_conditions or []]
+        + [str(o) for o in structured_rule.obligations or []]
+        + [str(e) for e in structured_rule.exceptions or []]
+    )
+
+
+def event_document(event) -> str:
+    parts = [str(getattr(event.workflow_type, "value", event.workflow_type))]
+    for key, value in (event.attributes or {}).items():
+        parts.append(key)
+        if isinstance(value, (str, bool, int, float)):
+            parts.append(str(value)[:MAX_VALUE_CHARS])
+    return " ".join(parts)
+
+
+class RuleRetrievalIndex:
+    """
+    In-process TF-IDF index over rule text and structured conditions, used to
+    send only the most relevant rules to the ComplianceReasoningAgent.
+
+    Documents are keyed by rule_id and re-vectorized only when the rule text or
+    its latest structured version changes; document frequencies are adjusted
+    incrementally and the packed weight matrix is rebuilt lazily.
+    """
+
+    def __init__(self):
+        self._docs: Dict[str, Tuple[tuple, np.ndarray, np.ndarray]] = {}
+        self._df = np.zeros(N_FEATURES, dtype=np.int32)
+        self._packed = None
+        self._lock = threading.Lock()
+
+    def sync(self, rules, structured_rules) -> None:
+        """Bring the index in line with the current active rules."""
+        rule_texts = {r.rule_id: r.rule_text for r in rules}
+        current = {}
+        for s_rule in structured_rules:
+            text = rule_texts.get(s_rule.rule_id, "")
+            current[s_rule.rule_id] = ((s_rule.id, text), s_rule, text)
+
+        with self._lock:
+            for rule_id in [r for r in self._docs if r not in current]:
+                self._remove(rule_id)
+            for rule_id, (fingerprint, s_rule, text) in current.items():
+                doc = self._docs.get(rule_id)
+                if doc is not None and doc[0] == fingerprint:
+                    continue
+                if doc is not None:
+                    self._remove(rule_id)
+                indices, counts = _hashed_features(rule_document(text, s_rule))
+                self._docs[rule_id] = (fingerprint, indices, counts)
+                self._df[indices] += 1
+                self._packed = None
+
+    def _remove(self, rule_id: str) -> None:
+        _, indices, _ = self._docs.pop(rule_id)
+        self._df[indices] -= 1
+        self._packed = None
+
+    def _pack(self):
+        """Concatenate per-rule sparse rows into CSR-style arrays with TF-IDF weights."""
+        rule_ids = list(self._docs)
+        n_docs = len(rule_ids)
+        idf = np.log((1 + n_docs) / (1 + self._df.astype(np.float32))) + 1.0
+        lengths = np.array([len(self._docs[r][1]) for r in rule_ids], dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        indices = np.concatenate([self._docs[r][1] for r in rule_ids])
+        weights = (1.0 + np.log(np.concatenate([self._docs[r][2] for r in rule_ids]))) * idf[indices]
+        norms = np.sqrt(np.add.reduceat(weights ** 2, starts))
+        weights /= np.repeat(np.maximum(norms, 1e-12), lengths)
+        self._packed = (rule_ids, starts, indices, weights, idf)
+        return self._packed
+
+    def score(self, event) -> Dict[str, float]:
+        with self._lock:
+            if not self._docs:
+                return {}
+            rule_ids, starts, indices, weights, idf = self._packed or self._pack()
+        q_indices, q_counts = _hashed_features(event_document(event))
+        query = np.zeros(N_FEATURES, dtype=np.float32)
+        query[q_indices] = (1.0 + np.log(q_counts)) * idf[q_indices]
+        scores = np.add.reduceat(query[indices] * weights, starts)
+        return dict(zip(rule_ids, scores.tolist()))
+
+    def select(
+        self,
+        event,
+        rules,
+        structured_rules,
+        top_k: int = RETRIEVAL_TOP_K,
+        mandatory: set = RETRIEVAL_MANDATORY_RULES
+    ) -> list:
+        """
+        Return the top_k structured rules most relevant to the event, plus any
+        mandatory ones, keeping their original order. A top_k of 0 or a rule
+        catalog no larger than top_k disables filtering.
+        """
+        if top_k <= 0 or len(structured_rules) <= top_k:
+            return list(structured_rules)
+        self.sync(rules, structured_rules)
+        scores = self.score(event)
+        ranked = sorted(
+            structured_rules,
+            key=lambda r: (-scores.get(r.rule_id, 0.0), r.rule_id)
+        )
+        chosen = {r.rule_id for r in ranked[:top_k]} | (mandatory & set(scores))
+        return [r for r in structured_rules if r.rule_id in chosen]
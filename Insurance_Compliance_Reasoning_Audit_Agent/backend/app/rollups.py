@@ -0,0 +1,141 @@
+from datetime import datetime
+
+from sqlalchemy import select, insert, update, delete, func, cast, event, literal, union_all, Integer
+from sqlalchemy.dialects import postgresql, sqlite
+
+from . import models, archive
+
+WorkflowEvent = models.WorkflowEvent
+ComplianceDecision = models.ComplianceDecision
+DecisionRollup = models.DecisionRollup
+
+
+def _day(column, dialect_name: str):
+    # SQLite has no DATE type; date() yields the same 'YYYY-MM-DD' text the Date type stores
+    if dialect_name == "sqlite":
+        return func.date(column)
+    return cast(column, DecisionRollup.day.type)
+
+
+def decision_workflow_type(workflow_event_id, workflow_id, before):
+    """
+    Workflow type a decision is counted under: that of the event it audited.
+    Decisions without a recorded event, or whose event has been archived,
+    fall back to the workflow's latest event as of `before` (the decision
+    time), then to workflow_state. Live counting, rebuild() and the
+    workflow_type filter of /decisions/search all use this, so they agree.
+    """
+    audited = select(WorkflowEvent.workflow_type).where(
+        WorkflowEvent.id == workflow_event_id
+    ).scalar_subquery()
+    latest = select(WorkflowEvent.workflow_type).where(
+        WorkflowEvent.workflow_id == workflow_id, WorkflowEvent.submitted_at <= before
+    ).order_by(WorkflowEvent.submitted_at.desc()).limit(1).scalar_subquery()
+    archived = select(models.WorkflowState.workflow_type).where(
+        models.WorkflowState.workflow_id == workflow_id
+    ).scalar_subquery()
+    return func.coalesce(audited, latest, archived)
+
+
+def workflow_types(session, decisions) -> dict:
+    """
+    {decision id: workflow type} for archived decisions, by the rule of
+    decision_workflow_type. An audited event that was archived too is read
+    from the archive, so the type is the one the decision was counted under.
+    """
+    event_ids = [d.workflow_event_id for d in decisions if d.workflow_event_id is not None]
+    archived_events = {
+        e.id: e.workflow_type for e in archive.find_rows(session, WorkflowEvent, ids=event_ids)
+    } if event_ids else {}
+    types = {
+        d.id: archived_events[d.workflow_event_id]
+        for d in decisions if d.workflow_event_id in archived_events
+    }
+    rest = [d for d in decisions if d.id not in types]
+    # SQLite allows at most 500 terms in a compound select
+    for i in range(0, len(rest), 100):
+        types.update(session.execute(union_all(*[
+            select(
+                literal(d.id, Integer).label("id"),
+                decision_workflow_type(d.workflow_event_id, d.workflow_id, d.created_at).label("workflow_type")
+            )
+            for d in rest[i:i + 100]
+        ])).all())
+    return types
+
+
+def _increment(connection, values: dict):
+    """Add one to a rollup row, creating it if needed."""
+    table = DecisionRollup.__table__
+    dialect_insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(
+        connection.dialect.name
+    )
+    if dialect_insert is not None:
+        statement = dialect_insert(table).values(**values, count=1)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.workflow_type, table.c.decision],
+            set_={"count": table.c.count + 1}
+        ))
+        return
+    key = (
+        (table.c.day == values["day"])
+        & (table.c.workflow_type == values["workflow_type"])
+        & (table.c.decision == values["decision"])
+    )
+    if connection.execute(update(table).where(key).values(count=table.c.count + 1)).rowcount == 0:
+        connection.execute(insert(table).values(**values, count=1))
+
+
+@event.listens_for(ComplianceDecision, "after_insert")
+def record_decision(mapper, connection, target):
+    """Count each new decision in the same transaction that inserts it."""
+    workflow_type = connection.execute(select(decision_workflow_type(
+        target.workflow_event_id, target.workflow_id, target.created_at
+    ))).scalar()
+    if workflow_type is None:
+        return
+    _increment(connection, {
+        "day": _day(func.current_timestamp(), connection.dialect.name),
+        "workflow_type": workflow_type,
+        "decision": target.decision
+    })
+
+
+def rebuild(connection) -> int:
+    """
+    Recompute rollup rows from compliance_decisions. Days whose decisions have
+    been archived are kept as they are. Returns the number of rows.
+    """
+    cutoff = archive.archived_until(connection, ComplianceDecision)
+    per_decision = select(
+        _day(ComplianceDecision.created_at, connection.dialect.name).label("day"),
+        decision_workflow_type(
+            ComplianceDecision.workflow_event_id, ComplianceDecision.workflow_id, ComplianceDecision.created_at
+        ).label("workflow_type"),
+        ComplianceDecision.decision
+    ).subquery()
+    counts = select(
+        per_decision.c.day,
+        per_decision.c.workflow_type,
+        per_decision.c.decision,
+        func.count()
+    ).where(
+        per_decision.c.workflow_type.is_not(None)
+    ).group_by(per_decision.c.day, per_decision.c.workflow_type, per_decision.c.decision)
+
+    clear = delete(DecisionRollup)
+    if cutoff is not None:
+        clear = clear.where(DecisionRollup.day >= cutoff)
+        counts = counts.where(per_decision.c.day >= _day(datetime(cutoff.year, cutoff.month, 1), connection.dialect.name))
+    connection.execute(clear)
+    connection.execute(insert(DecisionRollup).from_select(
+        ["day", "workflow_type", "decision", "count"], counts
+    ))
+    return connection.execute(select(func.count()).select_from(DecisionRollup)).scalar()
+
+
+def outcome_counts_statement():
+    """Totals per outcome across all days and workflow types."""
+    return select(DecisionRollup.decision, func.sum(DecisionRollup.count)).group_by(
+        DecisionRollup.decision
+    )
@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import select, update, or_
+from sqlalchemy.orm import Session
+
+from . import models
+
+History = models.RuleVersionHistory
+
+
+def _utc(value: datetime) -> datetime:
+    # Timestamps read back from SQLite are naive UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def record(
+    db: Session,
+    rule: models.ComplianceRule,
+    structured_rule: Optional[models.StructuredRule]
+) -> None:
+    """
+    Close the rule's open interval and, if it is active, open one for its new
+    structured version, in the caller's transaction. The change takes effect
+    now, or at the rule's effective_from if that is later.
+    """
+    at = datetime.now(timezone.utc)
+    if rule.effective_from is not None:
+        at = max(at, _utc(rule.effective_from))
+    db.execute(
+        update(History).where(
+            History.rule_id == rule.rule_id, History.valid_to.is_(None)
+        ).values(valid_to=at)
+    )
+    if rule.status == models.RuleStatus.ACTIVE and structured_rule is not None:
+        db.add(History(
+            rule_id=rule.rule_id,
+            version=structured_rule.version,
+            structured_rule_id=structured_rule.id,
+            valid_from=at
+        ))
+
+
+def as_of_statement(at: datetime):
+    """
+    Structured rules in force at a point in time: per rule, one probe of the
+    (rule_id, valid_from) index for the last interval starting by then, kept
+    if it had not ended. Unordered: sorting in SQL would add a sort step, so
+    callers sort the one-row-per-rule result themselves.
+    """
+    at = _utc(at)
+    rule_ids = select(models.ComplianceRule.rule_id).distinct().subquery()
+    latest = select(History.id).where(
+        History.rule_id == rule_ids.c.rule_id, History.valid_from <= at
+    ).order_by(History.valid_from.desc()).limit(1).correlate(rule_ids).scalar_subquery()
+    return select(models.StructuredRule).select_from(rule_ids).join(
+        History, History.id == latest
+    ).join(
+        models.StructuredRule, models.StructuredRule.id == History.structured_rule_id
+    ).where(
+        or_(History.valid_to.is_(None), History.valid_to > at)
+    )
+
+
+def rules_as_of(db: Session, at: datetime) -> List[models.StructuredRule]:
+    return sorted(db.execute(as_of_statement(at)).scalars(), key=lambda r: r.rule_id)
+
+
+def history_statement(rule_id: str):
+    return select(History).where(History.rule_id == rule_id).order_by(History.valid_from.desc())
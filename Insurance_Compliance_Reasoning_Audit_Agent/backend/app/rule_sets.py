@@ -0,0 +1,62 @@
+import threading
+from typing import List
+
+from sqlalchemy import select, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import models
+from .speculative import rule_set_version
+
+# Snapshots seen committed by this process; they are immutable, so never invalidated
+_known = set()
+_lock = threading.Lock()
+
+
+def _insert_missing(db: Session, model, rows: list) -> None:
+    if not rows:
+        return
+    table = model.__table__
+    dialect_insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(
+        db.get_bind().dialect.name
+    )
+    if dialect_insert is not None:
+        db.execute(dialect_insert(table).on_conflict_do_nothing(), rows)
+    else:
+        db.execute(insert(table), rows)
+
+
+def ensure_rule_set(db: Session, structured_rules) -> str:
+    """
+    Return the snapshot id for exactly these structured rules, adding the
+    snapshot in the caller's transaction if it does not exist yet.
+    """
+    rule_set_id = rule_set_version(structured_rules)
+    with _lock:
+        if rule_set_id in _known:
+            return rule_set_id
+    if db.get(models.RuleSet, rule_set_id) is not None:
+        with _lock:
+            _known.add(rule_set_id)
+        return rule_set_id
+
+    _insert_missing(db, models.RuleSet, [{"id": rule_set_id}])
+    _insert_missing(db, models.RuleSetMember, [
+        {"rule_set_id": rule_set_id, "structured_rule_id": s_rule.id}
+        for s_rule in {r.id: r for r in structured_rules}.values()
+    ])
+    return rule_set_id
+
+
+def rule_set_rules_statement(rule_set_id: str):
+    return select(models.StructuredRule).join(
+        models.RuleSetMember,
+        models.RuleSetMember.structured_rule_id == models.StructuredRule.id
+    ).where(
+        models.RuleSetMember.rule_set_id == rule_set_id
+    ).order_by(models.RuleSetMember.structured_rule_id)
+
+
+def load_rule_set(db: Session, rule_set_id: str) -> List[models.StructuredRule]:
+    """All structured rules of a snapshot, with one indexed query."""
+    return db.execute(rule_set_rules_statement(rule_set_id)).scalars().all()
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Generic, TypeVar
 from .models import (
     WorkflowType,
     RuleCategory,
@@ -22,6 +22,11 @@ class WorkflowEventCreate(WorkflowEventBase):
     pass
 
 
+class WorkflowEventImport(WorkflowEventBase):
+    # Historical loads keep the original submission time; defaults to now
+    submitted_at: Optional[datetime] = None
+
+
 class WorkflowEvent(WorkflowEventBase):
     id: int
     submitted_at: datetime
@@ -30,6 +35,20 @@ class WorkflowEvent(WorkflowEventBase):
         from_attributes = True
 
 
+class WorkflowState(BaseModel):
+    workflow_id: str
+    workflow_type: WorkflowType
+    attributes: Dict[str, Any]
+    actor_id: str
+    source_system: str
+    event_count: int
+    last_event_id: int
+    last_submitted_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class ComplianceRuleBase(BaseModel):
     rule_id: str
     category: RuleCategory
@@ -72,6 +91,27 @@ class StructuredRule(StructuredRuleBase):
         from_attributes = True
 
 
+class StructuredRuleDetail(StructuredRule):
+    raw_ai_output: Optional[str] = None
+
+
+class RuleVersion(BaseModel):
+    rule_id: str
+    version: str
+    structured_rule_id: int
+    valid_from: datetime
+    valid_to: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class RuleSet(BaseModel):
+    id: str
+    created_at: datetime
+    rules: List[StructuredRule]
+
+
 class ComplianceDecisionBase(BaseModel):
     workflow_id: str
     decision: DecisionOutcome
@@ -86,12 +126,50 @@ class ComplianceDecisionCreate(ComplianceDecisionBase):
 
 class ComplianceDecision(ComplianceDecisionBase):
     id: int
+    workflow_event_id: Optional[int] = None
+    rule_set_id: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ReplayRequest(BaseModel):
+    decision_ids: List[int]
+
+
+class BulkIngestError(BaseModel):
+    line: int  # NDJSON line number, or position in a JSON array, from 1
+    errors: List[Dict[str, Any]]
+
+
+class BulkIngestResult(BaseModel):
+    received: int
+    inserted: int
+    errors: List[BulkIngestError]
+    errors_truncated: bool = False
+
+
+class ComplianceDecisionSummary(BaseModel):
+    """List view of a decision; the reasoning trace is only served by the detail endpoint."""
+    id: int
+    workflow_id: str
+    decision: DecisionOutcome
+    violated_rules: List[str]
     created_at: datetime
 
     class Config:
         from_attributes = True
 
 
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
 class UserBase(BaseModel):
     username: str
 
@@ -119,13 +197,14 @@ class TokenData(BaseModel):
 class DashboardStats(BaseModel):
     total_audits: int
     compliance_stats: Dict[DecisionOutcome, int]
-    recent_audits: List[ComplianceDecision]
-    alerts: List[ComplianceDecision]
+    recent_audits: List[ComplianceDecisionSummary]
+    alerts: List[ComplianceDecisionSummary]
 
 
 class SystemMetrics(BaseModel):
     ai_metrics: Dict[str, int]
     average_latency_ms: float
+    decision_writer: Dict[str, float]
     rule_coverage: Dict[str, int]
     uptime_seconds: float
 
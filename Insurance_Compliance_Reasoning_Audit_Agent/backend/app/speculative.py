@@ -0,0 +1,86 @@
+import os
+import hashlib
+import logging
+import threading
+import concurrent.futures
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional, Tuple
+
+logger = logging.getLogger("compliance-audit")
+
+SPECULATIVE_AUDIT_ENABLED = os.getenv("SPECULATIVE_AUDIT_ENABLED", "false").lower() in ("1", "true", "yes")
+SPECULATIVE_CACHE_SIZE = int(os.getenv("SPECULATIVE_CACHE_SIZE", "1000"))
+SPECULATIVE_WAIT_SECONDS = float(os.getenv("SPECULATIVE_WAIT_SECONDS", "90"))
+
+
+def rule_set_version(structured_rules: Iterable) -> str:
+    """
+    Fingerprint the exact set of structured rules an evaluation ran against.
+    StructuredRule rows are immutable, so their primary keys identify the content.
+    This is also the id of the matching RuleSet snapshot.
+    """
+    ids = sorted(r.id for r in structured_rules)
+    return hashlib.sha256(",".join(str(i) for i in ids).encode()).hexdigest()
+
+
+class SpeculativeAuditor:
+    """
+    Pre-computes AI evaluations for freshly ingested workflow events so a later
+    audit of the same event against the same rule-set version returns at once.
+
+    Speculation runs on a single background worker so it never takes more than
+    one reasoning slot away from interactive audits. Results are only ever used
+    as the AI evaluation input; the decision itself is still produced by the
+    DecisionEngine and persisted as a normal ComplianceDecision.
+    """
+
+    def __init__(
+        self,
+        evaluate_fn: Callable[[int], Tuple[str, dict]],
+        enabled: bool = SPECULATIVE_AUDIT_ENABLED,
+        max_entries: int = SPECULATIVE_CACHE_SIZE,
+        wait_seconds: float = SPECULATIVE_WAIT_SECONDS
+    ):
+        self.evaluate_fn = evaluate_fn
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.wait_seconds = wait_seconds
+        self._futures: "OrderedDict[int, concurrent.futures.Future]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def submit(self, event_id: int) -> None:
+        """Queue a background evaluation of the given workflow event."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="speculative-audit"
+                )
+            self._futures[event_id] = self._executor.submit(self.evaluate_fn, event_id)
+            while len(self._futures) > self.max_entries:
+                _, stale = self._futures.popitem(last=False)
+                stale.cancel()
+
+    def claim(self, event_id: int, version: str) -> Optional[dict]:
+        """
+        Return the precomputed evaluation for this event if it was made against
+        the given rule-set version, otherwise None so the caller evaluates inline.
+        """
+        with self._lock:
+            future = self._futures.pop(event_id, None)
+        if future is None:
+            return None
+        # Not started yet: running it inline now is faster than waiting in line
+        if future.cancel():
+            return None
+        try:
+            speculated_version, evaluation = future.result(timeout=self.wait_seconds)
+        except Exception as e:
+            logger.warning(f"Speculative audit for event {event_id} unusable: {str(e)}")
+            return None
+        if speculated_version != version:
+            logger.info(f"Speculative audit for event {event_id} is stale (rule set changed)")
+            return None
+        return evaluation
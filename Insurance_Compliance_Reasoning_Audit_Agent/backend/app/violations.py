@@ -0,0 +1,48 @@
+from sqlalchemy import select, insert, event
+
+from . import models
+
+ComplianceDecision = models.ComplianceDecision
+DecisionViolation = models.DecisionViolation
+StructuredRule = models.StructuredRule
+
+
+def violation_rows(connection, decision_id: int, violated_rules, rule_versions, created_at) -> list:
+    """
+    Rows for decision_violations, with each rule's severity taken from the
+    structured version the decision was made against (or any version if
+    that one is unknown).
+    """
+    rule_ids = sorted(set(violated_rules or []))
+    if not rule_ids:
+        return []
+    severities, fallback = {}, {}
+    for rule_id, version, severity in connection.execute(
+        select(StructuredRule.rule_id, StructuredRule.version, StructuredRule.severity)
+        .where(StructuredRule.rule_id.in_(rule_ids))
+    ):
+        severities[(rule_id, version)] = severity
+        fallback[rule_id] = severity
+    rule_versions = rule_versions or {}
+    return [
+        {
+            "decision_id": decision_id,
+            "rule_id": rule_id,
+            "severity": severities.get((rule_id, rule_versions.get(rule_id)), fallback.get(rule_id)),
+            "created_at": created_at
+        }
+        for rule_id in rule_ids
+    ]
+
+
+@event.listens_for(ComplianceDecision, "after_insert")
+def record_violations(mapper, connection, target):
+    """Index a new decision's violated rules in the same transaction that inserts it."""
+    if not target.violated_rules:
+        return
+    # created_at is a server default; read it back so both tables hold the same value
+    created_at = connection.execute(
+        select(ComplianceDecision.created_at).where(ComplianceDecision.id == target.id)
+    ).scalar()
+    rows = violation_rows(connection, target.id, target.violated_rules, target.rule_versions, created_at)
+    connection.execute(insert(DecisionViolation), rows)
@@ -0,0 +1,200 @@
+from sqlalchemy import select, insert, update, delete, tuple_, bindparam, event
+from sqlalchemy.dialects import postgresql, sqlite
+
+from . import models, archive
+
+WorkflowEvent = models.WorkflowEvent
+WorkflowState = models.WorkflowState
+
+
+def _fold(state: dict, event_row) -> dict:
+    """Apply one event to a state row (a plain dict, or None for a new workflow)."""
+    attributes = dict(state["attributes"]) if state else {}
+    attributes.update(event_row.attributes or {})
+    return {
+        "workflow_id": event_row.workflow_id,
+        "workflow_type": event_row.workflow_type,
+        "attributes": attributes,
+        "actor_id": event_row.actor_id,
+        "source_system": event_row.source_system,
+        "event_count": (state["event_count"] if state else 0) + 1,
+        "last_event_id": event_row.id,
+        "last_submitted_at": event_row.submitted_at
+    }
+
+
+def _insert_missing(connection, rows: list) -> None:
+    """Create state rows unless a concurrent insert already did."""
+    table = WorkflowState.__table__
+    dialect_insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(
+        connection.dialect.name
+    )
+    if dialect_insert is not None:
+        connection.execute(dialect_insert(table).on_conflict_do_nothing(
+            index_elements=[table.c.workflow_id]
+        ), rows)
+        return
+    for values in rows:
+        if connection.execute(
+            select(table.c.workflow_id).where(table.c.workflow_id == values["workflow_id"])
+        ).first() is None:
+            connection.execute(insert(table).values(**values))
+
+
+@event.listens_for(WorkflowEvent, "after_insert")
+def record_event(mapper, connection, target):
+    """Fold each new event into its workflow's state in the same transaction."""
+    table = WorkflowState.__table__
+    events = WorkflowEvent.__table__
+    # submitted_at is usually a server default, so read the stored row back
+    event_row = connection.execute(select(events).where(events.c.id == target.id)).one()
+
+    _insert_missing(connection, [{**_fold(None, event_row), "event_count": 0}])
+    state = connection.execute(
+        select(table).where(table.c.workflow_id == target.workflow_id).with_for_update()
+    ).mappings().one()
+    if state["event_count"] and event_row.submitted_at < state["last_submitted_at"]:
+        # An event older than the snapshot (e.g. a historical load); refold in order
+        rebuild(connection, [target.workflow_id])
+        return
+    connection.execute(
+        update(table).where(table.c.workflow_id == target.workflow_id).values(
+            **_fold(state, event_row)
+        )
+    )
+
+
+def record_events(connection, event_rows) -> None:
+    """
+    Fold a batch of new events (rows of workflow_events) into state with one
+    statement per step rather than per event. Core inserts skip the
+    record_event listener, so bulk loaders call this in their transaction.
+    """
+    table = WorkflowState.__table__
+    by_workflow = {}
+    for event_row in sorted(event_rows, key=lambda e: (e.submitted_at, e.id)):
+        by_workflow.setdefault(event_row.workflow_id, []).append(event_row)
+    if not by_workflow:
+        return
+
+    def locked_states(workflow_ids):
+        return {
+            state["workflow_id"]: state for state in connection.execute(
+                select(table).where(table.c.workflow_id.in_(workflow_ids)).with_for_update()
+            ).mappings()
+        }
+
+    states = locked_states(list(by_workflow))
+    new_workflows = [workflow_id for workflow_id in by_workflow if workflow_id not in states]
+    if new_workflows:
+        _insert_missing(connection, [
+            {**_fold(None, by_workflow[workflow_id][0]), "event_count": 0} for workflow_id in new_workflows
+        ])
+        states.update(locked_states(new_workflows))
+    stale, folded = [], []
+    for workflow_id, events in by_workflow.items():
+        state = states[workflow_id]
+        if state["event_count"] and events[0].submitted_at < state["last_submitted_at"]:
+            # Older than the snapshot; refold in order, as record_event does
+            stale.append(workflow_id)
+            continue
+        for event_row in events:
+            state = _fold(state, event_row)
+        state["b_workflow_id"] = state.pop("workflow_id")
+        folded.append(state)
+    if folded:
+        connection.execute(
+            update(table).where(table.c.workflow_id == bindparam("b_workflow_id")).values(
+                {column: bindparam(column) for column in folded[0] if column != "b_workflow_id"}
+            ),
+            folded
+        )
+    if stale:
+        rebuild(connection, stale)
+
+
+def rebuild(connection, workflow_ids=None) -> int:
+    """
+    Recompute state rows from workflow_events, for the given workflows or all
+    of them, starting from their archived events. Returns the number of rows
+    written.
+    """
+    table = WorkflowState.__table__
+    events = WorkflowEvent.__table__
+    clear = delete(table)
+    statement = select(events).order_by(events.c.workflow_id, events.c.submitted_at, events.c.id)
+    if workflow_ids is not None:
+        clear = clear.where(table.c.workflow_id.in_(workflow_ids))
+        statement = statement.where(events.c.workflow_id.in_(workflow_ids))
+    connection.execute(clear)
+
+    # Archive files are in time order and all older than the hot table
+    archived = {}
+    for event_row in archive.iter_rows(connection, WorkflowEvent, workflow_ids=workflow_ids):
+        archived[event_row.workflow_id] = _fold(archived.get(event_row.workflow_id), event_row)
+
+    written, batch, state = 0, [], None
+    for event_row in connection.execution_options(yield_per=1000).execute(statement):
+        if state is not None and state["workflow_id"] != event_row.workflow_id:
+            batch.append(state)
+            state = None
+        if state is None:
+            state = archived.pop(event_row.workflow_id, None)
+        state = _fold(state, event_row)
+        if len(batch) >= 1000:
+            connection.execute(insert(table), batch)
+            written += len(batch)
+            batch = []
+    if state is not None:
+        batch.append(state)
+    # Workflows with no events left in the hot table
+    batch.extend(archived.values())
+    for i in range(0, len(batch), 1000):
+        connection.execute(insert(table), batch[i:i + 1000])
+    return written + len(batch)
+
+
+def _fold_events(connection, statement, archived=()):
+    rows = list(archived) + list(connection.execute(statement))
+    state = None
+    for event_row in sorted(rows, key=lambda e: (e.submitted_at, e.id)):
+        state = _fold(state, event_row)
+    return WorkflowState(**state) if state else None
+
+
+def _archived_events(connection, workflow_id: str):
+    return list(archive.iter_rows(connection, WorkflowEvent, workflow_ids=[workflow_id]))
+
+
+def state_as_of(connection, workflow_id: str, at):
+    """Transient state of a workflow from the events submitted up to a point in time."""
+    archived = [e for e in _archived_events(connection, workflow_id) if e.submitted_at <= at]
+    return _fold_events(connection, select(WorkflowEvent.__table__).where(
+        WorkflowEvent.workflow_id == workflow_id, WorkflowEvent.submitted_at <= at
+    ), archived)
+
+
+def state_through(db, workflow_event: models.WorkflowEvent):
+    """
+    State of a workflow as it was right after the given event. This is the
+    stored row when that event is still the latest, otherwise a transient one
+    refolded from history, archived events included.
+    """
+    state = db.get(WorkflowState, workflow_event.workflow_id)
+    if state is not None and state.last_event_id == workflow_event.id:
+        return state
+    connection = db.connection()
+    through = (workflow_event.submitted_at, workflow_event.id)
+    archived = [
+        e for e in _archived_events(connection, workflow_event.workflow_id)
+        if (e.submitted_at, e.id) <= through
+    ]
+    # Compare against the stored timestamp (see pagination.keyset_page); for an
+    # archived event the anchor is NULL and only archived history applies
+    anchor = select(WorkflowEvent.submitted_at).where(
+        WorkflowEvent.id == workflow_event.id
+    ).correlate(None).scalar_subquery()
+    return _fold_events(connection, select(WorkflowEvent.__table__).where(
+        WorkflowEvent.workflow_id == workflow_event.workflow_id,
+        tuple_(WorkflowEvent.submitted_at, WorkflowEvent.id) <= tuple_(anchor, workflow_event.id)
+    ), archived)
@@ -0,0 +1,42 @@
+"""
+Move cold months of workflow_events and compliance_decisions into archive files.
+
+Each month older than ARCHIVE_AFTER_MONTHS (default 24) is written to a
+gzipped, read-only file under ARCHIVE_DIR and catalogued in archive_partitions,
+then deleted from the hot table, one transaction per month. Archived rows stay
+readable through the workflow and decision endpoints (see app/archive.py).
+
+    python archive_partitions.py [--before YYYY-MM]
+"""
+import os
+import sys
+import argparse
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine
+from app import models, archive
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--before", help="Archive months before this one (YYYY-MM)")
+    args = parser.parse_args()
+
+    if args.before:
+        before = archive.month_start(datetime.strptime(args.before, "%Y-%m"))
+    else:
+        before = archive.add_months(
+            archive.month_start(datetime.now(timezone.utc)), -archive.ARCHIVE_AFTER_MONTHS
+        )
+
+    for model in (models.WorkflowEvent, models.ComplianceDecision):
+        with engine.connect() as connection:
+            months = archive.months_to_archive(connection, model, before)
+        for month in months:
+            with engine.begin() as connection:
+                moved = archive.archive_month(connection, model, month)
+            if moved:
+                print(f"Archived {model.__tablename__} {month:%Y-%m}: {moved} rows.")
+    print(f"Archived everything before {before:%Y-%m}.")
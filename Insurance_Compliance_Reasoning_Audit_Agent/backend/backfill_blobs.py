@@ -0,0 +1,71 @@
+"""
+Move inline reasoning traces and raw AI output into content_blobs.
+
+Rows written before content-addressed storage keep these values inline (see
+BlobBacked in app/models.py). This stores them as blobs and clears the inline
+column, a batch of rows per transaction, so the saving also applies to old
+rows and the inline read path can eventually go. An interrupted run simply
+continues with the rows still inline when run again:
+
+    python backfill_blobs.py
+    python backfill_blobs.py --batch-size 500
+"""
+import os
+import sys
+import argparse
+
+from sqlalchemy import select, update, bindparam, null
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import models, blobs
+from app.database import engine
+
+BLOB_ATTRIBUTES = [
+    (models.ComplianceDecision, models.ComplianceDecision.reasoning_trace),
+    (models.StructuredRule, models.StructuredRule.raw_ai_output),
+]
+
+
+def backfill(engine, model, attribute, batch_size: int) -> int:
+    """Move one BlobBacked attribute's inline values into blobs. Returns the rows moved."""
+    table = model.__table__
+    inline = model.__mapper__.attrs[attribute.inline].columns[0]
+    refs = model.__mapper__.attrs[attribute.refs].columns[0]
+    # Core update: the ORM refuses updates on these immutable models
+    move = update(table).where(table.c.id == bindparam("b_id")).values({
+        refs.key: bindparam("b_refs", type_=refs.type),
+        inline.key: null()
+    })
+    moved, last_id = 0, 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                select(table.c.id, inline).where(inline.is_not(None), table.c.id > last_id)
+                .order_by(table.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                return moved
+            # One blob insert for the whole batch, then each row takes its slice of hashes
+            payloads = [
+                [blobs.encode_json(item) for item in value] if attribute.per_item else [value.encode()]
+                for _, value in rows
+            ]
+            hashes = iter(blobs.put_many(connection, models.ContentBlob.__table__, [p for ps in payloads for p in ps]))
+            values = []
+            for (row_id, _), row_payloads in zip(rows, payloads):
+                row_hashes = [next(hashes) for _ in row_payloads]
+                values.append({"b_id": row_id, "b_refs": row_hashes if attribute.per_item else row_hashes[0]})
+            connection.execute(move, values)
+        moved += len(rows)
+        last_id = rows[-1].id
+        print(f"{table.name}: {moved} rows moved", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per transaction")
+    args = parser.parse_args()
+    for model, attribute in BLOB_ATTRIBUTES:
+        moved = backfill(engine, model, attribute, args.batch_size)
+        print(f"{model.__tablename__}: moved {moved} inline values to content_blobs.")
@@ -0,0 +1,191 @@
+"""
+Concurrency benchmarks.
+
+http mode fires concurrent authenticated GET requests at a running backend and
+reports throughput and latency percentiles. To compare the sync and async DB
+paths, start uvicorn from each revision against the same database and run e.g.:
+
+    python benchmark_concurrency.py --concurrency 50 --requests 2000 \
+        --path /dashboard/stats --path /decisions/ --path /users/me/
+
+db mode compares engine profiles (see DB_ENGINE_PROFILE in app/database.py)
+with concurrent writer and reader threads on a scratch database, which is
+deleted and recreated before each profile. It refuses to run against the app
+database (DATABASE_URL or READ_REPLICA_URL) unless --i-know-this-drops-data
+is passed:
+
+    python benchmark_concurrency.py --mode db --profile default --profile sqlite \
+        --database-url sqlite:///./benchmark.db
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+import threading
+import httpx
+from sqlalchemy import func, select, create_engine, make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import models, database
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(label, latencies, errors, elapsed):
+    print(f"{label}")
+    print(f"  requests:   {len(latencies) + errors} ({errors} errors)")
+    print(f"  throughput: {len(latencies) / elapsed:.1f} req/s")
+    if latencies:
+        print(
+            f"  latency ms: p50={percentile(latencies, 50):.1f} "
+            f"p95={percentile(latencies, 95):.1f} "
+            f"p99={percentile(latencies, 99):.1f} "
+            f"mean={statistics.mean(latencies):.1f}"
+        )
+
+
+async def run_http(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        response = await client.post(
+            "/token", data={"username": args.username, "password": args.password}
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        for path in args.path:
+            latencies, errors = [], 0
+            queue = asyncio.Queue()
+            for _ in range(args.requests):
+                queue.put_nowait(path)
+
+            async def worker():
+                nonlocal errors
+                while not queue.empty():
+                    queue.get_nowait()
+                    start = time.perf_counter()
+                    try:
+                        r = await client.get(path, headers=headers)
+                        r.raise_for_status()
+                        latencies.append((time.perf_counter() - start) * 1000)
+                    except httpx.HTTPError:
+                        errors += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            report(f"GET {path} x{args.concurrency} concurrent", latencies, errors, time.perf_counter() - start)
+
+
+def same_database(a: str, b: str) -> bool:
+    a, b = make_url(a), make_url(b)
+    if a.get_backend_name() != b.get_backend_name():
+        return False
+    if a.get_backend_name() == "sqlite":
+        if a.database in (None, "", ":memory:") or b.database in (None, "", ":memory:"):
+            return False
+        return os.path.abspath(a.database) == os.path.abspath(b.database)
+    return (a.host, a.port, a.database) == (b.host, b.port, b.database)
+
+
+def reset_database(url: str) -> None:
+    """
+    Empty the scratch database, so no profile inherits the journal mode, file
+    layout or rows left by the one before it.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        if url.database and url.database != ":memory:":
+            for suffix in ("", "-wal", "-shm", "-journal"):
+                if os.path.exists(url.database + suffix):
+                    os.remove(url.database + suffix)
+        return
+    scratch_engine = create_engine(url)
+    models.Base.metadata.drop_all(scratch_engine)
+    scratch_engine.dispose()
+
+
+def run_db(args):
+    app_databases = [database.DATABASE_URL, database.READ_REPLICA_URL]
+    if not args.i_know_this_drops_data and any(u and same_database(args.database_url, u) for u in app_databases):
+        raise SystemExit(
+            f"{args.database_url} is the app database, and db mode deletes it before each profile. "
+            "Point --database-url at a scratch database, or pass --i-know-this-drops-data."
+        )
+    for profile in args.profile:
+        reset_database(args.database_url)
+        bench_engine = database.build_engine(args.database_url, profile)
+        models.Base.metadata.create_all(bench_engine)
+        Session = sessionmaker(bind=bench_engine)
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        def writer(worker_id):
+            for i in range(args.requests // args.concurrency):
+                start = time.perf_counter()
+                db = Session()
+                try:
+                    if i % 4 == 0:
+                        db.execute(select(func.count()).select_from(models.WorkflowEvent)).scalar()
+                    else:
+                        db.add(models.WorkflowEvent(
+                            workflow_id=f"BENCH-{worker_id}-{i}",
+                            workflow_type=models.WorkflowType.CLAIM_PROCESSING,
+                            attributes={"claim_id": f"CLM-{worker_id}-{i}"},
+                            actor_id="benchmark",
+                            source_system="benchmark"
+                        ))
+                        db.commit()
+                    with lock:
+                        latencies.append((time.perf_counter() - start) * 1000)
+                except OperationalError as e:
+                    db.rollback()
+                    with lock:
+                        errors.append(str(e.orig))
+                finally:
+                    db.close()
+
+        threads = [threading.Thread(target=writer, args=(w,)) for w in range(args.concurrency)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        report(
+            f"profile={profile} {args.concurrency} threads (3 writes : 1 read)",
+            latencies, len(errors), time.perf_counter() - start
+        )
+        locked = sum("locked" in e for e in errors)
+        if errors:
+            print(f"  'database is locked' errors: {locked}")
+        bench_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["http", "db"], default="http")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="adminpassword")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per path (http) or in total (db)")
+    parser.add_argument("--path", action="append", help="Endpoint to benchmark (repeatable)")
+    parser.add_argument("--database-url", default="sqlite:///./benchmark.db", help="Scratch database for db mode")
+    parser.add_argument("--profile", action="append", help="Engine profile for db mode (repeatable)")
+    parser.add_argument(
+        "--i-know-this-drops-data", action="store_true",
+        help="Allow db mode to wipe --database-url even when it is the app database"
+    )
+    args = parser.parse_args()
+    if args.mode == "db":
+        args.profile = args.profile or ["default", "auto"]
+        run_db(args)
+    else:
+        args.path = args.path or ["/dashboard/stats", "/decisions/", "/users/me/"]
+        asyncio.run(run_http(args))
@@ -0,0 +1,45 @@
+"""
+Check that every audit hot-path query is served by an index.
+
+Runs EXPLAIN (EXPLAIN QUERY PLAN on SQLite) for each query in app/hot_queries.py and exits
+non-zero if any of them falls back to a full table scan or a separate sort.
+Point it at a migrated database, or use --scratch to check the indexes
+declared on the models against a throwaway SQLite schema:
+
+    python explain_hot_queries.py
+    python explain_hot_queries.py --scratch
+"""
+import os
+import sys
+import argparse
+from sqlalchemy import create_engine
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import models, database
+from app.hot_queries import HOT_QUERIES, plan_problems
+
+
+def check(engine):
+    failures = 0
+    with engine.begin() as connection:
+        for name, statement in HOT_QUERIES.items():
+            plan, problems = plan_problems(connection, statement)
+            failures += bool(problems)
+            print(f"[{'FAIL' if problems else 'ok'}] {name}")
+            for line in plan:
+                print(f"       {line}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=database.DATABASE_URL)
+    parser.add_argument("--scratch", action="store_true", help="Check model indexes on an in-memory SQLite schema")
+    args = parser.parse_args()
+    if args.scratch:
+        engine = create_engine("sqlite://")
+        models.Base.metadata.create_all(engine)
+    else:
+        engine = create_engine(args.database_url)
+    sys.exit(1 if check(engine) else 0)
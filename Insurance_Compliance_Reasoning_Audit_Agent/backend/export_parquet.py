@@ -0,0 +1,408 @@
+"""
+Export decisions, violations and workflow events to Parquet for analytics.
+
+Writes three Hive-partitioned datasets (month=YYYY-MM) under --output-dir:
+
+  decisions/   one row per decision, with its workflow type, rule set and a
+               rule_<RULE_ID> column per catalogued rule: VIOLATED,
+               SATISFIED, or empty if the rule was not evaluated
+  violations/  one row per violated rule of a decision, with its severity
+  events/      one row per workflow event, attributes as a JSON string
+
+Rows are read in chunks through a server-side cursor and appended to the
+open file of their month, so memory does not grow with the table size.
+A full export includes archived months and replaces the datasets. With
+--delta only rows added since the last run are written, as new files next
+to the existing ones; the high-water marks are kept in _export_state.json.
+Ids are assigned before commit, so on Postgres a row can become visible
+after a higher id already has: ids missing from the last --overlap ids
+below a mark are remembered and exported by a later delta once they appear.
+The rule_<RULE_ID> columns are kept in the state file too, so every file of
+the decisions dataset has the same schema; when a delta adds a rule column,
+the existing decision files are rewritten with it, empty.
+Needs pyarrow (in requirements.txt).
+
+    python export_parquet.py --output-dir ./analytics
+    python export_parquet.py --output-dir ./analytics --delta
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+from datetime import datetime, timezone
+
+from sqlalchemy import select, func, inspect
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import models, database, archive
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    raise SystemExit("export_parquet.py needs pyarrow: pip install -r requirements.txt")
+
+Decision = models.ComplianceDecision
+WorkflowEvent = models.WorkflowEvent
+STATE_FILE = "_export_state.json"
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+DECISION_FIELDS = [
+    ("id", pa.int64()),
+    ("workflow_id", pa.string()),
+    ("workflow_event_id", pa.int64()),
+    ("workflow_type", pa.string()),
+    ("decision", pa.string()),
+    ("violation_count", pa.int32()),
+    ("rule_set_id", pa.string()),
+    ("created_at", TIMESTAMP),
+]
+VIOLATION_SCHEMA = pa.schema([
+    ("decision_id", pa.int64()),
+    ("workflow_id", pa.string()),
+    ("workflow_type", pa.string()),
+    ("rule_id", pa.string()),
+    ("rule_version", pa.string()),
+    ("severity", pa.string()),
+    ("created_at", TIMESTAMP),
+])
+EVENT_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("workflow_id", pa.string()),
+    ("workflow_type", pa.string()),
+    ("actor_id", pa.string()),
+    ("source_system", pa.string()),
+    ("attributes", pa.string()),
+    ("submitted_at", TIMESTAMP),
+])
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _value(value):
+    return value.value if hasattr(value, "value") else value
+
+
+class PartitionedWriter:
+    """Appends row chunks to one Parquet file per month of a dataset."""
+
+    def __init__(self, root: str, schema: "pa.Schema", time_column: str, file_name: str):
+        self.root, self.schema, self.time_column, self.file_name = root, schema, time_column, file_name
+        self.writers = {}
+        self.rows = 0
+
+    def write(self, rows: list) -> None:
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(f"{row[self.time_column]:%Y-%m}", []).append(row)
+        for month, month_rows in by_month.items():
+            if month not in self.writers:
+                directory = os.path.join(self.root, f"month={month}")
+                os.makedirs(directory, exist_ok=True)
+                self.writers[month] = pq.ParquetWriter(
+                    os.path.join(directory, self.file_name), self.schema, compression="zstd"
+                )
+            self.writers[month].write_table(pa.Table.from_pylist(month_rows, schema=self.schema))
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        for writer in self.writers.values():
+            writer.close()
+
+
+def decision_schema(rule_ids: list) -> "pa.Schema":
+    return pa.schema(DECISION_FIELDS + [(f"rule_{r}", pa.string()) for r in rule_ids])
+
+
+def widen(output_dir: str, staging: str, schema: "pa.Schema") -> int:
+    """
+    Stage copies of the published decision files that lack columns of the
+    schema, with those columns empty; publish() swaps them in. Returns the
+    number of files rewritten.
+    """
+    root, rewritten = os.path.join(output_dir, "decisions"), 0
+    if not os.path.exists(root):
+        return rewritten
+    for partition in sorted(os.listdir(root)):
+        for name in sorted(os.listdir(os.path.join(root, partition))):
+            source = pq.ParquetFile(os.path.join(root, partition, name))
+            if source.schema_arrow.names == schema.names:
+                continue
+            os.makedirs(os.path.join(staging, "decisions", partition), exist_ok=True)
+            with pq.ParquetWriter(
+                os.path.join(staging, "decisions", partition, name), schema, compression="zstd"
+            ) as writer:
+                for batch in source.iter_batches():
+                    writer.write_batch(pa.RecordBatch.from_arrays([
+                        batch.column(field.name) if field.name in batch.schema.names
+                        else pa.nulls(batch.num_rows, field.type)
+                        for field in schema
+                    ], schema=schema))
+            rewritten += 1
+    return rewritten
+
+
+class IdWatermark:
+    """
+    Which ids of a table a delta still has to export: those above the last
+    mark, and those within `overlap` of it that were missing last time.
+    """
+
+    def __init__(self, after: int, missing: list, mark: int, overlap: int):
+        self.after, self.missing, self.mark, self.overlap = after, set(missing), mark, overlap
+        self.seen = set()
+
+    @property
+    def scan_after(self) -> int:
+        """Lower bound (exclusive) of the ids to read."""
+        return min(self.missing, default=self.after + 1) - 1
+
+    def wanted(self, row_id: int) -> bool:
+        if row_id > self.mark or (row_id <= self.after and row_id not in self.missing):
+            return False
+        if row_id > self.mark - self.overlap:
+            self.seen.add(row_id)
+        return True
+
+    def still_missing(self) -> list:
+        floor = self.mark - self.overlap
+        candidates = self.missing | set(range(max(self.after, floor) + 1, self.mark + 1))
+        return sorted(i for i in candidates if i > floor and i not in self.seen)
+
+
+class Exporter:
+    def __init__(self, connection, staging: str, file_name: str, rule_ids: list):
+        self.connection = connection
+        self.rule_set_versions = {}
+        self.rule_ids = rule_ids
+        self.decisions = PartitionedWriter(os.path.join(staging, "decisions"), decision_schema(rule_ids), "created_at", file_name)
+        self.violations = PartitionedWriter(os.path.join(staging, "violations"), VIOLATION_SCHEMA, "created_at", file_name)
+        self.events = PartitionedWriter(os.path.join(staging, "events"), EVENT_SCHEMA, "submitted_at", file_name)
+        severities = connection.execute(
+            select(models.ComplianceRule.rule_id, models.ComplianceRule.severity).order_by(models.ComplianceRule.id)
+        ).all()
+        # Latest catalog severity, for violations no longer in decision_violations
+        self.severities = {rule_id: _value(severity) for rule_id, severity in severities}
+
+    def _versions(self, decision) -> dict:
+        if decision["rule_versions"] is not None or decision["rule_set_id"] is None:
+            return decision["rule_versions"] or {}
+        if decision["rule_set_id"] not in self.rule_set_versions:
+            self.rule_set_versions.update(models.rule_set_versions(self.connection, [decision["rule_set_id"]]))
+        return self.rule_set_versions[decision["rule_set_id"]]
+
+    def write_decisions(self, chunk: list) -> None:
+        """chunk: dicts with the compliance_decisions columns plus workflow_type."""
+        Violation = models.DecisionViolation
+        # Severity as recorded at decision time, where the violation index still has it
+        recorded = {
+            (decision_id, rule_id): severity for decision_id, rule_id, severity in self.connection.execute(
+                select(Violation.decision_id, Violation.rule_id, Violation.severity)
+                .where(Violation.decision_id.in_([d["id"] for d in chunk]))
+            )
+        }
+        decision_rows, violation_rows = [], []
+        for d in chunk:
+            versions, violated = self._versions(d), set(d["violated_rules"] or [])
+            created_at = _utc(d["created_at"])
+            row = {
+                "id": d["id"],
+                "workflow_id": d["workflow_id"],
+                "workflow_event_id": d["workflow_event_id"],
+                "workflow_type": _value(d["workflow_type"]),
+                "decision": _value(d["decision"]),
+                "violation_count": len(violated),
+                "rule_set_id": d["rule_set_id"],
+                "created_at": created_at,
+            }
+            for rule_id in self.rule_ids:
+                if rule_id in violated:
+                    row[f"rule_{rule_id}"] = "VIOLATED"
+                elif rule_id in versions:
+                    row[f"rule_{rule_id}"] = "SATISFIED"
+            decision_rows.append(row)
+            for rule_id in sorted(violated):
+                severity = recorded.get((d["id"], rule_id))
+                violation_rows.append({
+                    "decision_id": d["id"],
+                    "workflow_id": d["workflow_id"],
+                    "workflow_type": row["workflow_type"],
+                    "rule_id": rule_id,
+                    "rule_version": versions.get(rule_id),
+                    "severity": _value(severity) if severity is not None else self.severities.get(rule_id),
+                    "created_at": created_at,
+                })
+        self.decisions.write(decision_rows)
+        if violation_rows:
+            self.violations.write(violation_rows)
+
+    def write_events(self, chunk: list) -> None:
+        self.events.write([{
+            "id": e["id"],
+            "workflow_id": e["workflow_id"],
+            "workflow_type": _value(e["workflow_type"]),
+            "actor_id": e["actor_id"],
+            "source_system": e["source_system"],
+            "attributes": json.dumps(e["attributes"], sort_keys=True),
+            "submitted_at": _utc(e["submitted_at"]),
+        } for e in chunk])
+
+    def close(self) -> None:
+        for writer in (self.decisions, self.violations, self.events):
+            writer.close()
+
+
+def _chunks(rows, size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _archived(connection, model):
+    """Archived rows as column dicts, oldest month first."""
+    for instance in archive.iter_rows(connection, model):
+        yield {c.name: getattr(instance, attr.key) for attr in inspect(model).column_attrs for c in attr.columns}
+
+
+def decision_rows(connection, after_id: int, include_archive: bool, chunk_size: int):
+    event_type = select(WorkflowEvent.workflow_type).where(
+        WorkflowEvent.id == Decision.workflow_event_id
+    ).scalar_subquery()
+    state_type = select(models.WorkflowState.workflow_type).where(
+        models.WorkflowState.workflow_id == Decision.workflow_id
+    ).scalar_subquery()
+    if include_archive:
+        # Archived decisions take their workflow type from workflow_state
+        states = {}
+        for chunk in _chunks(_archived(connection, Decision), chunk_size):
+            missing = {d["workflow_id"] for d in chunk} - states.keys()
+            states.update(connection.execute(
+                select(models.WorkflowState.workflow_id, models.WorkflowState.workflow_type)
+                .where(models.WorkflowState.workflow_id.in_(missing))
+            ).all())
+            yield from ({**d, "workflow_type": states.get(d["workflow_id"])} for d in chunk)
+    statement = select(
+        *Decision.__table__.c, func.coalesce(event_type, state_type).label("workflow_type")
+    ).where(Decision.id > after_id).order_by(Decision.id)
+    for row in connection.execution_options(stream_results=True, yield_per=chunk_size).execute(statement).mappings():
+        yield dict(row)
+
+
+def event_rows(connection, after_id: int, include_archive: bool, chunk_size: int):
+    if include_archive:
+        yield from _archived(connection, WorkflowEvent)
+    statement = select(WorkflowEvent.__table__).where(WorkflowEvent.id > after_id).order_by(WorkflowEvent.id)
+    for row in connection.execution_options(stream_results=True, yield_per=chunk_size).execute(statement).mappings():
+        yield dict(row)
+
+
+def load_state(output_dir: str) -> dict:
+    path = os.path.join(output_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def publish(staging: str, output_dir: str, delta: bool) -> None:
+    """Move the staged datasets into place: alongside existing files for a delta, replacing them otherwise."""
+    for dataset in ("decisions", "violations", "events"):
+        source, target = os.path.join(staging, dataset), os.path.join(output_dir, dataset)
+        if not delta and os.path.exists(target):
+            shutil.rmtree(target)
+        if not os.path.exists(source):
+            continue
+        for partition in os.listdir(source):
+            os.makedirs(os.path.join(target, partition), exist_ok=True)
+            for name in os.listdir(os.path.join(source, partition)):
+                os.replace(os.path.join(source, partition, name), os.path.join(target, partition, name))
+    # Nothing is staged when a delta finds no new rows
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output-dir", default="./analytics")
+    parser.add_argument("--delta", action="store_true", help="Only export rows added since the last run")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows read per fetch and written per row group")
+    parser.add_argument(
+        "--overlap", type=int, default=10000,
+        help="How many ids below a high-water mark a later delta re-checks for late commits"
+    )
+    args = parser.parse_args()
+
+    state = load_state(args.output_dir) if args.delta else {}
+    if args.delta and not state:
+        print("No previous export found; running a full export.")
+        args.delta = False
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    staging = os.path.join(args.output_dir, f".staging-{run_id}")
+    file_name = f"part-{run_id}.parquet"
+
+    with database.engine.connect() as connection:
+        # One read transaction, so both tables and the high-water marks agree
+        with connection.begin():
+            marks = {
+                table: IdWatermark(
+                    state.get(table, 0),
+                    state.get("missing_ids", {}).get(table, []),
+                    connection.execute(select(func.max(model.id))).scalar() or 0,
+                    args.overlap
+                )
+                for table, model in (("compliance_decisions", Decision), ("workflow_events", WorkflowEvent))
+            }
+            # Keep the published column order; rules new to the catalog are appended
+            catalog = sorted(connection.execute(select(models.ComplianceRule.rule_id)).scalars())
+            rule_columns = state.get("rule_columns", []) if args.delta else []
+            rule_columns = rule_columns + [r for r in catalog if r not in rule_columns]
+            exporter = Exporter(connection, staging, file_name, rule_columns)
+            completed = False
+            try:
+                if args.delta and rule_columns != state.get("rule_columns"):
+                    rewritten = widen(args.output_dir, staging, decision_schema(rule_columns))
+                    print(f"Added rule columns to {rewritten} existing decision files.")
+                decisions = marks["compliance_decisions"]
+                for chunk in _chunks(decision_rows(
+                    connection, decisions.scan_after, not args.delta, args.chunk_size
+                ), args.chunk_size):
+                    chunk = [d for d in chunk if decisions.wanted(d["id"])]
+                    if chunk:
+                        exporter.write_decisions(chunk)
+                events = marks["workflow_events"]
+                for chunk in _chunks(event_rows(
+                    connection, events.scan_after, not args.delta, args.chunk_size
+                ), args.chunk_size):
+                    chunk = [e for e in chunk if events.wanted(e["id"])]
+                    if chunk:
+                        exporter.write_events(chunk)
+                completed = True
+            finally:
+                exporter.close()
+                if not completed:
+                    shutil.rmtree(staging, ignore_errors=True)
+
+    publish(staging, args.output_dir, args.delta)
+    with open(os.path.join(args.output_dir, STATE_FILE), "w") as f:
+        json.dump({
+            **{table: mark.mark for table, mark in marks.items()},
+            "missing_ids": {table: mark.still_missing() for table, mark in marks.items()},
+            "rule_columns": rule_columns,
+            "exported_at": run_id
+        }, f)
+    print(
+        f"Exported {exporter.decisions.rows} decisions, {exporter.violations.rows} violations "
+        f"and {exporter.events.rows} events to {args.output_dir}"
+        f"{' (delta)' if args.delta else ''}."
+    )
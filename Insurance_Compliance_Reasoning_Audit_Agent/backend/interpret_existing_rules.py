@@ -1,40 +1,208 @@
-import sys
 import os
-from sqlalchemy.orm import Session
+import json
+import argparse
+import threading
+import concurrent.futures
+from sqlalchemy import insert
 from app.database import SessionLocal
-from app.models import ComplianceRule, StructuredRule
+from app.models import ComplianceRule, StructuredRule, ContentBlob
+from app import blobs, rule_history
 from app.agents import PolicyInterpreterAgent
+from app.interpretation import interpretation_key
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("interpret-rules")
 
-def interpret_rules():
+DEFAULT_CHECKPOINT = ".interpret_checkpoint.jsonl"
+
+_local = threading.local()
+
+
+def _interpreter() -> PolicyInterpreterAgent:
+    # One agent per worker thread; crew/agent objects are not shared across threads
+    if not hasattr(_local, "interpreter"):
+        _local.interpreter = PolicyInterpreterAgent()
+    return _local.interpreter
+
+
+def _interpret_pack(rules):
+    return _interpreter().interpret_many(rules)
+
+
+def load_checkpoint(path):
+    """Structured rules interpreted by a previous run but possibly not yet inserted."""
+    interpreted = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    data = json.loads(line)
+                    interpreted[data["rule_id"]] = data
+    return interpreted
+
+
+def load_cached(db, keys):
+    """Latest prior interpretation for each content hash, in IN-list chunks."""
+    keys = list(keys)
+    cached = {}
+    for i in range(0, len(keys), 500):
+        rows = db.query(StructuredRule).filter(
+            StructuredRule.content_hash.in_(keys[i:i + 500])
+        ).order_by(StructuredRule.created_at, StructuredRule.id).all()
+        cached.update({row.content_hash: row for row in rows})
+    return cached
+
+
+def latest_rules(query):
+    """One ComplianceRule per rule_id: the latest row (highest id); duplicates are logged and skipped."""
+    rules = {}
+    for rule in query.order_by(ComplianceRule.id):
+        if rule.rule_id in rules:
+            logger.warning(
+                f"Duplicate rule_id {rule.rule_id}: using row {rule.id}, skipping row {rules[rule.rule_id].id}"
+            )
+        rules[rule.rule_id] = rule
+    return rules
+
+
+def insert_batch(db, rows):
+    if not rows:
+        return
+    # Fresh interpretations carry their raw output as text; store it as a blob
+    fresh = [row for row in rows if row.get("raw_ai_output") is not None]
+    hashes = blobs.put_many(
+        db.connection(), ContentBlob.__table__, [row["raw_ai_output"].encode() for row in fresh]
+    )
+    for row, digest in zip(fresh, hashes):
+        row["raw_ai_output_ref"] = digest
+    for row in rows:
+        row.pop("raw_ai_output", None)
+    inserted = db.execute(
+        insert(StructuredRule).returning(
+            StructuredRule.id, StructuredRule.rule_id, StructuredRule.version, sort_by_parameter_order=True
+        ),
+        rows
+    ).all()
+    # Open each rule's version-history interval in the same transaction
+    rules = latest_rules(db.query(ComplianceRule).filter(
+        ComplianceRule.rule_id.in_([row.rule_id for row in inserted])
+    ))
+    for structured_rule in inserted:
+        rule_history.record(db, rules[structured_rule.rule_id], structured_rule)
+    db.commit()
+    logger.info(f"Inserted {len(rows)} structured rules")
+
+
+def interpret_rules(
+    concurrency: int = 4,
+    pack_size: int = 1,
+    batch_size: int = 50,
+    checkpoint_path: str = DEFAULT_CHECKPOINT
+):
     db = SessionLocal()
-    interpreter = PolicyInterpreterAgent()
     try:
-        rules = db.query(ComplianceRule).all()
-        for rule in rules:
-            # Check if already structured
-            existing = db.query(StructuredRule).filter(StructuredRule.rule_id == rule.rule_id).first()
-            if existing:
-                logger.info(f"Rule {rule.rule_id} already has structured data, skipping.")
-                continue
-            
-            logger.info(f"Interpreting rule: {rule.rule_id}")
-            try:
-                structured_data = interpreter.interpret(rule)
-                db_structured_rule = StructuredRule(**structured_data.model_dump())
-                db.add(db_structured_rule)
-                db.commit()
-                logger.info(f"Successfully structured rule: {rule.rule_id}")
-            except Exception as e:
-                logger.error(f"Failed to interpret rule {rule.rule_id}: {e}")
-                db.rollback()
-        
+        # One query for everything already structured instead of one per rule
+        structured_ids = {
+            rule_id for (rule_id,) in db.query(StructuredRule.rule_id).distinct()
+        }
+        # Structured rules and checkpoints are keyed by rule_id, so interpret the
+        # same row per rule_id that insert_batch records history against
+        pending = [
+            rule for rule in latest_rules(db.query(ComplianceRule)).values()
+            if rule.rule_id not in structured_ids
+        ]
+        logger.info(
+            f"{len(structured_ids)} rules already have structured data, "
+            f"{len(pending)} to interpret."
+        )
+
+        # Resume: anything interpreted before an interruption goes straight to the DB
+        checkpointed = load_checkpoint(checkpoint_path)
+        buffer = [checkpointed[r.rule_id] for r in pending if r.rule_id in checkpointed]
+        if buffer:
+            logger.info(f"Resuming {len(buffer)} interpretations from {checkpoint_path}")
+        to_interpret = [r for r in pending if r.rule_id not in checkpointed]
+
+        # Rules whose content was interpreted before need no LLM call at all
+        keys = {r.rule_id: interpretation_key(r) for r in pending}
+        cached = load_cached(db, set(keys[r.rule_id] for r in to_interpret))
+        reusable = [r for r in to_interpret if keys[r.rule_id] in cached]
+        for rule in reusable:
+            prior = cached[keys[rule.rule_id]]
+            buffer.append({
+                "rule_id": rule.rule_id,
+                "version": rule.version,
+                "applicability_conditions": prior.applicability_conditions,
+                "obligations": prior.obligations,
+                "exceptions": prior.exceptions,
+                "severity": rule.severity,
+                "raw_ai_output_inline": prior.raw_ai_output_inline,
+                "raw_ai_output_ref": prior.raw_ai_output_ref,
+                "content_hash": keys[rule.rule_id]
+            })
+        to_interpret = [r for r in to_interpret if keys[r.rule_id] not in cached]
+        logger.info(f"{len(reusable)} rules reused cached interpretations")
+
+        packs = [
+            to_interpret[i:i + pack_size]
+            for i in range(0, len(to_interpret), pack_size)
+        ]
+        failed = []
+        with open(checkpoint_path, "a") as checkpoint, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {executor.submit(_interpret_pack, pack): pack for pack in packs}
+            while futures:
+                done, _ = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    pack = futures.pop(future)
+                    try:
+                        interpreted = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to interpret {[r.rule_id for r in pack]}: {e}")
+                        interpreted = {}
+
+                    missing = [r for r in pack if r.rule_id not in interpreted]
+                    if len(pack) > 1 and missing:
+                        # Packed prompt dropped some rules; retry those one by one
+                        for rule in missing:
+                            futures[executor.submit(_interpret_pack, [rule])] = [rule]
+                    else:
+                        failed.extend(r.rule_id for r in missing)
+
+                    for rule_id, structured_data in interpreted.items():
+                        # Keyed by the rule sent, whatever id the model echoed back
+                        row = structured_data.model_dump(mode="json")
+                        row["rule_id"] = rule_id
+                        row["content_hash"] = keys[rule_id]
+                        checkpoint.write(json.dumps(row) + "\n")
+                        buffer.append(row)
+                        logger.info(f"Successfully structured rule: {row['rule_id']}")
+                    checkpoint.flush()
+
+                if len(buffer) >= batch_size:
+                    insert_batch(db, buffer)
+                    buffer = []
+
+        insert_batch(db, buffer)
+
+        if failed:
+            logger.error(f"Failed to interpret {len(failed)} rules: {', '.join(failed)}")
+        else:
+            os.remove(checkpoint_path)
         print("Interpretation completed.")
     finally:
         db.close()
 
+
 if __name__ == "__main__":
-    interpret_rules()
+    parser = argparse.ArgumentParser(description="Interpret compliance rules that have no structured version yet.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel LLM calls")
+    parser.add_argument("--pack-size", type=int, default=1, help="Rules per interpreter prompt")
+    parser.add_argument("--batch-size", type=int, default=50, help="Structured rules per insert transaction")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Checkpoint file for resuming")
+    args = parser.parse_args()
+    interpret_rules(args.concurrency, args.pack_size, args.batch_size, args.checkpoint)
@@ -0,0 +1,259 @@
+"""
+Load historical workflow events from CSV, NDJSON or Parquet files.
+
+Files are streamed and written in batches, one transaction each, using the
+fastest path the database offers: COPY on Postgres, multi-row executemany on
+SQLite with the workflow_events indexes dropped for the load and rebuilt at
+the end. Each batch commits together with a checkpoint (load_checkpoints), so
+an interrupted load resumes where it stopped when run again with the same
+files. Each batch's events are folded into workflow_state in the same
+transaction, touching only the workflows in that batch.
+
+Rows have the WorkflowEvent fields plus an optional submitted_at (ISO 8601,
+UTC if no offset; defaults to the load time). In CSV files, attributes is a
+JSON object and any other column is added to it as a string. Parquet needs
+pyarrow (in requirements.txt).
+
+    python load_workflow_events.py claims-2019.csv access-2019.ndjson.gz
+    python load_workflow_events.py --batch-size 20000 --rejects rejects.ndjson events.parquet
+"""
+import io
+import os
+import sys
+import csv
+import gzip
+import json
+import time
+import argparse
+import itertools
+from datetime import datetime, timezone
+
+from pydantic import ValidationError
+from sqlalchemy import select, insert, update, text, table, column
+from sqlalchemy.schema import CreateIndex
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import models, schemas, database, workflow_state, attribute_search
+
+WorkflowEvent = models.WorkflowEvent
+Checkpoint = models.LoadCheckpoint
+COLUMNS = ["workflow_id", "workflow_type", "attributes", "actor_id", "source_system", "submitted_at"]
+
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def read_csv(path: str):
+    with _open_text(path) as source:
+        for row in csv.DictReader(source):
+            extra = {column: row.pop(column) for column in list(row) if column not in COLUMNS}
+            if not row.get("submitted_at"):
+                row.pop("submitted_at", None)
+            # attributes stays a JSON string here; validate() decodes it
+            yield {**row, "attributes": row.get("attributes") or "{}", "extra_attributes": extra}
+
+
+def read_ndjson(path: str):
+    with _open_text(path) as source:
+        for line in source:
+            if line.strip():
+                yield line
+
+
+def read_parquet(path: str, batch_size: int):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Loading Parquet files needs pyarrow: pip install -r requirements.txt")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+def read_rows(path: str, file_format: str, batch_size: int):
+    if file_format == "csv":
+        return read_csv(path)
+    if file_format == "ndjson":
+        return read_ndjson(path)
+    return read_parquet(path, batch_size)
+
+
+def detect_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    extension = os.path.splitext(name)[1].lower()
+    formats = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".json": "ndjson", ".parquet": "parquet"}
+    if extension not in formats:
+        raise SystemExit(f"Cannot tell the format of {path}; pass --format")
+    return formats[extension]
+
+
+def validate(row, loaded_at: datetime) -> dict:
+    """A workflow_events row; raises ValueError or ValidationError for a bad input row."""
+    if isinstance(row, str):
+        row = json.loads(row)
+    if isinstance(row, dict) and isinstance(row.get("attributes"), str):
+        row = {**row, "attributes": json.loads(row["attributes"])}
+    if isinstance(row, dict) and "extra_attributes" in row:
+        extra = row.pop("extra_attributes")
+        if isinstance(row["attributes"], dict):
+            row["attributes"] = {**row["attributes"], **extra}
+    event = schemas.WorkflowEventImport.model_validate(row).model_dump()
+    submitted_at = event["submitted_at"] or loaded_at
+    if submitted_at.tzinfo is None:
+        submitted_at = submitted_at.replace(tzinfo=timezone.utc)
+    event["submitted_at"] = submitted_at.astimezone(timezone.utc)
+    return event
+
+
+def copy_rows(connection, rows: list) -> list:
+    """
+    Postgres COPY of one batch on the connection's open transaction. COPY
+    cannot return rows, so it fills a temporary table that is then moved into
+    workflow_events; returns the inserted rows.
+    """
+    connection.execute(text(
+        "CREATE TEMP TABLE IF NOT EXISTS workflow_events_load ON COMMIT DELETE ROWS AS "
+        f"SELECT {', '.join(COLUMNS)} FROM workflow_events WITH NO DATA"
+    ))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            row["workflow_id"],
+            row["workflow_type"].name,
+            json.dumps(row["attributes"]),
+            row["actor_id"],
+            row["source_system"],
+            row["submitted_at"].isoformat()
+        ])
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY workflow_events_load ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+    events = WorkflowEvent.__table__
+    staged = table("workflow_events_load", *[column(name) for name in COLUMNS])
+    return connection.execute(
+        insert(events).from_select(COLUMNS, select(*staged.c)).returning(*events.c)
+    ).all()
+
+
+# Refolding a workflow's state reads its events through this index, so it stays
+KEPT_INDEX = "ix_workflow_events_workflow_id_submitted_at"
+
+
+def defer_indexes(connection) -> None:
+    """Drop the secondary indexes of workflow_events on SQLite; restore_indexes recreates them."""
+    names = connection.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'index' "
+        "AND tbl_name = 'workflow_events' AND sql IS NOT NULL AND name != :kept"
+    ), {"kept": KEPT_INDEX}).scalars().all()
+    for name in names:
+        connection.execute(text(f'DROP INDEX "{name}"'))
+
+
+def restore_indexes(engine) -> None:
+    with engine.begin() as connection:
+        for index in WorkflowEvent.__table__.indexes:
+            # Skip indexes limited to another dialect (ddl_if), as create_all() does
+            ddl_if = index._ddl_if
+            if ddl_if is not None and ddl_if.dialect is not None:
+                dialects = [ddl_if.dialect] if isinstance(ddl_if.dialect, str) else ddl_if.dialect
+                if engine.dialect.name not in dialects:
+                    continue
+            connection.execute(CreateIndex(index, if_not_exists=True))
+    attribute_search.ensure_attribute_indexes(engine)
+
+
+def rows_done(engine, source: str) -> int:
+    with engine.begin() as connection:
+        checkpoint = connection.execute(
+            select(Checkpoint.rows_done).where(Checkpoint.source == source)
+        ).scalar()
+        if checkpoint is None:
+            connection.execute(insert(Checkpoint).values(source=source, rows_done=0))
+            return 0
+        return checkpoint
+
+
+def load_file(engine, path: str, args, rejects) -> tuple:
+    """Load one file from its checkpoint. Returns (rows loaded, rows rejected)."""
+    source = os.path.abspath(path)
+    done = rows_done(engine, source)
+    use_copy = engine.dialect.driver == "psycopg2" and not args.no_copy
+    loaded_at = datetime.now(timezone.utc)
+    rows = itertools.islice(read_rows(path, args.format or detect_format(path), args.batch_size), done, None)
+    if done:
+        print(f"{path}: resuming after {done} rows")
+
+    loaded, rejected, started = 0, 0, time.monotonic()
+    while True:
+        raw_batch = list(itertools.islice(rows, args.batch_size))
+        if not raw_batch:
+            break
+        batch = []
+        for position, row in enumerate(raw_batch, start=done + 1):
+            try:
+                batch.append(validate(row, loaded_at))
+            except ValueError as e:
+                # pydantic's ValidationError is a ValueError too, as is a JSON decode error
+                rejected += 1
+                if rejects is not None:
+                    errors = e.errors(include_url=False) if isinstance(e, ValidationError) else str(e)
+                    rejects.write(json.dumps({"source": source, "row": position, "errors": errors}, default=str) + "\n")
+        with engine.begin() as connection:
+            if batch:
+                if use_copy:
+                    inserted = copy_rows(connection, batch)
+                else:
+                    events = WorkflowEvent.__table__
+                    inserted = connection.execute(
+                        insert(events).returning(*events.c, sort_by_parameter_order=True), batch
+                    ).all()
+                # Core inserts skip the record_event listener
+                if not args.skip_state_rebuild:
+                    workflow_state.record_events(connection, inserted)
+            done += len(raw_batch)
+            # The checkpoint commits with the batch, so a rerun never loads a row twice
+            connection.execute(update(Checkpoint).where(Checkpoint.source == source).values(rows_done=done))
+        loaded += len(batch)
+        elapsed = time.monotonic() - started
+        print(f"{path}: {done} rows read, {loaded} loaded, {rejected} rejected ({loaded / elapsed:.0f} rows/s)", flush=True)
+    return loaded, rejected
+
+
+def load(engine, args) -> tuple:
+    """Load args.files in order. Returns (rows loaded, rows rejected) over all of them."""
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as connection:
+            defer_indexes(connection)
+    rejects = open(args.rejects, "a", encoding="utf-8") if args.rejects else None
+    try:
+        totals = [load_file(engine, path, args, rejects) for path in args.files]
+    finally:
+        if rejects is not None:
+            rejects.close()
+        if engine.dialect.name == "sqlite":
+            print("Rebuilding workflow_events indexes...", flush=True)
+            restore_indexes(engine)
+    return sum(t[0] for t in totals), sum(t[1] for t in totals)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--format", choices=["csv", "ndjson", "parquet"], help="Default: from the file extension")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows per transaction")
+    parser.add_argument("--rejects", help="Append rows that fail validation to this NDJSON file")
+    parser.add_argument("--no-copy", action="store_true", help="Use INSERT instead of COPY on Postgres (psycopg2)")
+    parser.add_argument("--skip-state-rebuild", action="store_true", help="Leave workflow_state for rebuild_workflow_state.py")
+    args = parser.parse_args()
+
+    loaded, rejected = load(database.engine, args)
+    print(f"Loaded {loaded} events, rejected {rejected}.")
@@ -0,0 +1,67 @@
+"""Rule-set snapshots referenced from decisions
+
+Revision ID: 0a6c5e9d3f21
+Revises: f4d2b8a6c071
+Create Date: 2026-10-19 15:20:44.108736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a6c5e9d3f21'
+down_revision: Union[str, Sequence[str], None] = 'f4d2b8a6c071'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite batch mode rebuilds the table and reflects these without their DESC
+# ordering. Frozen at this revision: the DESC indexes compliance_decisions has
+# here, not whatever the models declare later. f4d2b8a6c071 has the same list
+# for its own rebuild; migrations do not import each other.
+DECISION_INDEXES = {
+    'ix_compliance_decisions_workflow_id_created_at': ['workflow_id', sa.text('created_at DESC')],
+    'ix_compliance_decisions_decision_created_at': ['decision', sa.text('created_at DESC')],
+    'ix_compliance_decisions_created_at_id': [sa.text('created_at DESC'), sa.text('id DESC')],
+}
+
+
+def _restore_decision_indexes() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for name, columns in DECISION_INDEXES.items():
+        op.drop_index(name, table_name='compliance_decisions')
+        op.create_index(name, 'compliance_decisions', columns, unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rule_sets',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('rule_set_members',
+    sa.Column('rule_set_id', sa.String(length=64), nullable=False),
+    sa.Column('structured_rule_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('rule_set_id', 'structured_rule_id')
+    )
+    # Existing decisions keep their inline rule_versions and have no snapshot
+    with op.batch_alter_table('compliance_decisions') as batch_op:
+        batch_op.add_column(sa.Column('rule_set_id', sa.String(length=64), nullable=True))
+        batch_op.alter_column('rule_versions', existing_type=sa.JSON(), nullable=True)
+    _restore_decision_indexes()
+    op.create_index('ix_compliance_decisions_rule_set_id_created_at', 'compliance_decisions', ['rule_set_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_compliance_decisions_rule_set_id_created_at', table_name='compliance_decisions')
+    with op.batch_alter_table('compliance_decisions') as batch_op:
+        batch_op.alter_column('rule_versions', existing_type=sa.JSON(), nullable=False)
+        batch_op.drop_column('rule_set_id')
+    _restore_decision_indexes()
+    op.drop_table('rule_set_members')
+    op.drop_table('rule_sets')
@@ -0,0 +1,30 @@
+"""Add content_hash to structured_rules
+
+Revision ID: 4b8e2f1c9a73
+Revises: d153d131269f
+Create Date: 2026-10-19 09:12:40.318224
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e2f1c9a73'
+down_revision: Union[str, Sequence[str], None] = 'd153d131269f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('structured_rules', sa.Column('content_hash', sa.String(), nullable=True))
+    op.create_index(op.f('ix_structured_rules_content_hash'), 'structured_rules', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_structured_rules_content_hash'), table_name='structured_rules')
+    op.drop_column('structured_rules', 'content_hash')
@@ -0,0 +1,74 @@
+"""Add workflow_state
+
+Revision ID: 5e8a2c7d1b90
+Revises: a3b7d2f9c410
+Create Date: 2026-10-19 17:18:50.662104
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8a2c7d1b90'
+down_revision: Union[str, Sequence[str], None] = 'a3b7d2f9c410'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _json(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # workflowtype already exists from the workflow_events table
+    state_table = op.create_table('workflow_state',
+    sa.Column('workflow_id', sa.String(), nullable=False),
+    sa.Column('workflow_type', postgresql.ENUM('CLAIM_PROCESSING', 'POLICY_ISSUANCE', 'DATA_ACCESS_REQUEST', 'APPROVAL_ESCALATION', name='workflowtype', create_type=False), nullable=False),
+    sa.Column('attributes', sa.JSON(), nullable=False),
+    sa.Column('actor_id', sa.String(), nullable=False),
+    sa.Column('source_system', sa.String(), nullable=False),
+    sa.Column('event_count', sa.Integer(), nullable=False),
+    sa.Column('last_event_id', sa.Integer(), nullable=False),
+    sa.Column('last_submitted_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('workflow_id')
+    )
+
+    # Backfill by folding each workflow's events in submission order
+    bind = op.get_bind()
+    events = bind.execute(sa.text(
+        "SELECT id, workflow_id, workflow_type, attributes, actor_id, source_system, submitted_at "
+        "FROM workflow_events ORDER BY workflow_id, submitted_at, id"
+    ).columns(submitted_at=sa.DateTime(timezone=True)))
+    rows, state = [], None
+    for event_id, workflow_id, workflow_type, attributes, actor_id, source_system, submitted_at in events:
+        if state is None or state["workflow_id"] != workflow_id:
+            if state is not None:
+                rows.append(state)
+            state = {"workflow_id": workflow_id, "attributes": {}, "event_count": 0}
+        state["attributes"].update(_json(attributes) or {})
+        state.update({
+            "workflow_type": workflow_type,
+            "actor_id": actor_id,
+            "source_system": source_system,
+            "event_count": state["event_count"] + 1,
+            "last_event_id": event_id,
+            "last_submitted_at": submitted_at
+        })
+        if len(rows) >= 1000:
+            op.bulk_insert(state_table, rows)
+            rows = []
+    if state is not None:
+        rows.append(state)
+    if rows:
+        op.bulk_insert(state_table, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('workflow_state')
@@ -0,0 +1,40 @@
+"""Record the audited workflow event on decisions
+
+Revision ID: 6d1f0b8e2a47
+Revises: 0a6c5e9d3f21
+Create Date: 2026-10-19 16:02:13.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d1f0b8e2a47'
+down_revision: Union[str, Sequence[str], None] = '0a6c5e9d3f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('compliance_decisions', sa.Column('workflow_event_id', sa.Integer(), nullable=True))
+    # Backfill with the event replay used to guess: the latest one submitted before the decision
+    op.execute(
+        """
+        UPDATE compliance_decisions SET workflow_event_id = (
+            SELECT e.id FROM workflow_events e
+            WHERE e.workflow_id = compliance_decisions.workflow_id
+              AND e.submitted_at <= compliance_decisions.created_at
+            ORDER BY e.submitted_at DESC, e.id DESC
+            LIMIT 1
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('compliance_decisions', 'workflow_event_id')
@@ -0,0 +1,50 @@
+"""Add archive partition catalog
+
+Revision ID: 7c2e9a4f1d63
+Revises: 5e8a2c7d1b90
+Create Date: 2026-10-19 19:02:14.318227
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9a4f1d63'
+down_revision: Union[str, Sequence[str], None] = '5e8a2c7d1b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('archive_partitions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('min_id', sa.Integer(), nullable=False),
+    sa.Column('max_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('path')
+    )
+    op.create_index('ix_archive_partitions_table_name_min_id', 'archive_partitions', ['table_name', 'min_id'], unique=False)
+    op.create_index('ix_archive_partitions_table_name_month', 'archive_partitions', ['table_name', sa.text('month DESC')], unique=False)
+    op.create_table('archive_partition_workflows',
+    sa.Column('workflow_id', sa.String(), nullable=False),
+    sa.Column('partition_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('workflow_id', 'partition_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('archive_partition_workflows')
+    op.drop_index('ix_archive_partitions_table_name_month', table_name='archive_partitions')
+    op.drop_index('ix_archive_partitions_table_name_min_id', table_name='archive_partitions')
+    op.drop_table('archive_partitions')
@@ -0,0 +1,52 @@
+"""Add decision_rollups
+
+Revision ID: 7f3b9e2c4d18
+Revises: e5a7c3d91b24
+Create Date: 2026-10-19 12:21:43.902115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3b9e2c4d18'
+down_revision: Union[str, Sequence[str], None] = 'e5a7c3d91b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Enum types already exist from the workflow_events / compliance_decisions tables
+    op.create_table('decision_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('workflow_type', postgresql.ENUM('CLAIM_PROCESSING', 'POLICY_ISSUANCE', 'DATA_ACCESS_REQUEST', 'APPROVAL_ESCALATION', name='workflowtype', create_type=False), nullable=False),
+    sa.Column('decision', postgresql.ENUM('COMPLIANT', 'NON_COMPLIANT', 'REQUIRES_REVIEW', name='decisionoutcome', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'workflow_type', 'decision')
+    )
+
+    # Backfill from existing decisions (same query as app.rollups.rebuild)
+    day = "date(d.created_at)" if op.get_bind().dialect.name == "sqlite" else "CAST(d.created_at AS DATE)"
+    op.execute(f"""
+        INSERT INTO decision_rollups (day, workflow_type, decision, count)
+        SELECT day, workflow_type, decision, count(*) FROM (
+            SELECT {day} AS day, d.decision AS decision, (
+                SELECT e.workflow_type FROM workflow_events e
+                WHERE e.workflow_id = d.workflow_id AND e.submitted_at <= d.created_at
+                ORDER BY e.submitted_at DESC LIMIT 1
+            ) AS workflow_type
+            FROM compliance_decisions d
+        ) per_decision
+        WHERE workflow_type IS NOT NULL
+        GROUP BY day, workflow_type, decision
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('decision_rollups')
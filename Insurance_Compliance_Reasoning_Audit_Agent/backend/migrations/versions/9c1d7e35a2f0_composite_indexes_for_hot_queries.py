@@ -0,0 +1,60 @@
+"""Composite indexes for audit hot-path queries
+
+Revision ID: 9c1d7e35a2f0
+Revises: 4b8e2f1c9a73
+Create Date: 2026-10-19 10:02:17.554930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1d7e35a2f0'
+down_revision: Union[str, Sequence[str], None] = '4b8e2f1c9a73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_workflow_events_workflow_id_submitted_at', 'workflow_events', ['workflow_id', sa.text('submitted_at DESC')], unique=False)
+    op.create_index('ix_structured_rules_rule_id_created_at', 'structured_rules', ['rule_id', sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_structured_rules_rule_id_version', 'structured_rules', ['rule_id', 'version'], unique=False)
+    op.create_index('ix_compliance_decisions_workflow_id_created_at', 'compliance_decisions', ['workflow_id', sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_compliance_decisions_decision_created_at', 'compliance_decisions', ['decision', sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_compliance_decisions_created_at', 'compliance_decisions', [sa.text('created_at DESC')], unique=False)
+
+    # Primary keys are already indexed
+    op.drop_index('ix_workflow_events_id', table_name='workflow_events')
+    op.drop_index('ix_compliance_rules_id', table_name='compliance_rules')
+    op.drop_index('ix_structured_rules_id', table_name='structured_rules')
+    op.drop_index('ix_compliance_decisions_id', table_name='compliance_decisions')
+    op.drop_index('ix_users_id', table_name='users')
+
+    # Single-column indexes that are now leading prefixes of the composites above
+    op.drop_index('ix_workflow_events_workflow_id', table_name='workflow_events')
+    op.drop_index('ix_structured_rules_rule_id', table_name='structured_rules')
+    op.drop_index('ix_compliance_decisions_workflow_id', table_name='compliance_decisions')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_compliance_decisions_workflow_id', 'compliance_decisions', ['workflow_id'], unique=False)
+    op.create_index('ix_structured_rules_rule_id', 'structured_rules', ['rule_id'], unique=False)
+    op.create_index('ix_workflow_events_workflow_id', 'workflow_events', ['workflow_id'], unique=False)
+
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_compliance_decisions_id', 'compliance_decisions', ['id'], unique=False)
+    op.create_index('ix_structured_rules_id', 'structured_rules', ['id'], unique=False)
+    op.create_index('ix_compliance_rules_id', 'compliance_rules', ['id'], unique=False)
+    op.create_index('ix_workflow_events_id', 'workflow_events', ['id'], unique=False)
+
+    op.drop_index('ix_compliance_decisions_created_at', table_name='compliance_decisions')
+    op.drop_index('ix_compliance_decisions_decision_created_at', table_name='compliance_decisions')
+    op.drop_index('ix_compliance_decisions_workflow_id_created_at', table_name='compliance_decisions')
+    op.drop_index('ix_structured_rules_rule_id_version', table_name='structured_rules')
+    op.drop_index('ix_structured_rules_rule_id_created_at', table_name='structured_rules')
+    op.drop_index('ix_workflow_events_workflow_id_submitted_at', table_name='workflow_events')
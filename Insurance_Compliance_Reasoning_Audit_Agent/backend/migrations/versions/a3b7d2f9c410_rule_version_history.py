@@ -0,0 +1,68 @@
+"""Add rule_version_history
+
+Revision ID: a3b7d2f9c410
+Revises: 6d1f0b8e2a47
+Create Date: 2026-10-19 16:41:27.093318
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3b7d2f9c410'
+down_revision: Union[str, Sequence[str], None] = '6d1f0b8e2a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    history = op.create_table('rule_version_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('rule_id', sa.String(), nullable=False),
+    sa.Column('version', sa.String(), nullable=False),
+    sa.Column('structured_rule_id', sa.Integer(), nullable=False),
+    sa.Column('valid_from', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('valid_to', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_rule_version_history_valid_from_valid_to', 'rule_version_history', ['valid_from', 'valid_to'], unique=False)
+    op.create_index('ix_rule_version_history_rule_id_valid_from', 'rule_version_history', ['rule_id', sa.text('valid_from DESC')], unique=False)
+
+    # Backfill: each structured version was in force from its creation until the next one.
+    # Status changes were never recorded, so the last interval of a rule that is no
+    # longer active is closed at migration time.
+    bind = op.get_bind()
+    statuses = dict(bind.execute(sa.text("SELECT rule_id, status FROM compliance_rules")).all())
+    now = datetime.now(timezone.utc)
+    structured = bind.execute(sa.text(
+        "SELECT id, rule_id, version, created_at FROM structured_rules ORDER BY rule_id, created_at, id"
+    ).columns(created_at=sa.DateTime(timezone=True))).all()
+    rows = []
+    for i, (structured_id, rule_id, version, created_at) in enumerate(structured):
+        if rule_id not in statuses:
+            continue
+        if i + 1 < len(structured) and structured[i + 1][1] == rule_id:
+            valid_to = structured[i + 1][3]
+        else:
+            valid_to = None if statuses[rule_id] == 'ACTIVE' else now
+        rows.append({
+            "rule_id": rule_id,
+            "version": version,
+            "structured_rule_id": structured_id,
+            "valid_from": created_at,
+            "valid_to": valid_to
+        })
+    if rows:
+        op.bulk_insert(history, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_rule_version_history_rule_id_valid_from', table_name='rule_version_history')
+    op.drop_index('ix_rule_version_history_valid_from_valid_to', table_name='rule_version_history')
+    op.drop_table('rule_version_history')
@@ -0,0 +1,71 @@
+"""Add decision_violations
+
+Revision ID: b21d8f6e0c53
+Revises: 7f3b9e2c4d18
+Create Date: 2026-10-19 13:05:12.447019
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b21d8f6e0c53'
+down_revision: Union[str, Sequence[str], None] = '7f3b9e2c4d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _json(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ruleseverity already exists from the compliance_rules table
+    violations = op.create_table('decision_violations',
+    sa.Column('decision_id', sa.Integer(), nullable=False),
+    sa.Column('rule_id', sa.String(), nullable=False),
+    sa.Column('severity', postgresql.ENUM('LOW', 'MEDIUM', 'HIGH', name='ruleseverity', create_type=False), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('decision_id', 'rule_id')
+    )
+    op.create_index('ix_decision_violations_rule_id_created_at', 'decision_violations', ['rule_id', sa.text('created_at DESC'), sa.text('decision_id DESC')], unique=False)
+
+    # Backfill from the JSON violated_rules of existing decisions
+    bind = op.get_bind()
+    severities, fallback = {}, {}
+    for rule_id, version, severity in bind.execute(sa.text(
+        "SELECT rule_id, version, severity FROM structured_rules"
+    )):
+        severities[(rule_id, version)] = severity
+        fallback[rule_id] = severity
+
+    rows = []
+    decisions = bind.execute(sa.text(
+        "SELECT id, violated_rules, rule_versions, created_at FROM compliance_decisions"
+    ).columns(created_at=sa.DateTime(timezone=True)))
+    for decision_id, violated_rules, rule_versions, created_at in decisions:
+        rule_versions = _json(rule_versions) or {}
+        for rule_id in sorted(set(_json(violated_rules) or [])):
+            rows.append({
+                "decision_id": decision_id,
+                "rule_id": rule_id,
+                "severity": severities.get((rule_id, rule_versions.get(rule_id)), fallback.get(rule_id)),
+                "created_at": created_at
+            })
+        if len(rows) >= 1000:
+            op.bulk_insert(violations, rows)
+            rows = []
+    if rows:
+        op.bulk_insert(violations, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_decision_violations_rule_id_created_at', table_name='decision_violations')
+    op.drop_table('decision_violations')
@@ -0,0 +1,33 @@
+"""Add load_checkpoints
+
+Revision ID: b8d4f1e6a392
+Revises: 7c2e9a4f1d63
+Create Date: 2026-10-19 20:11:37.540981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d4f1e6a392'
+down_revision: Union[str, Sequence[str], None] = '7c2e9a4f1d63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('load_checkpoints',
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('rows_done', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('source')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('load_checkpoints')
@@ -0,0 +1,39 @@
+"""JSONB workflow attributes with GIN index
+
+Revision ID: c8e4a1f7b935
+Revises: b21d8f6e0c53
+Create Date: 2026-10-19 13:52:36.120583
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e4a1f7b935'
+down_revision: Union[str, Sequence[str], None] = 'b21d8f6e0c53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite attribute indexes follow WORKFLOW_ATTRIBUTE_INDEXES and are created at app startup
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.alter_column('workflow_events', 'attributes', type_=postgresql.JSONB(), existing_type=sa.JSON(),
+                    existing_nullable=False, postgresql_using='attributes::jsonb')
+    op.create_index('ix_workflow_events_attributes', 'workflow_events', ['attributes'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'attributes': 'jsonb_path_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index('ix_workflow_events_attributes', table_name='workflow_events')
+    op.alter_column('workflow_events', 'attributes', type_=sa.JSON(), existing_type=postgresql.JSONB(),
+                    existing_nullable=False, postgresql_using='attributes::json')
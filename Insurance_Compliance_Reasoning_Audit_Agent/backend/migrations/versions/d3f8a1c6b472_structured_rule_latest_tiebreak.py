@@ -0,0 +1,30 @@
+"""Break ties on structured_rules latest-version index by id
+
+Revision ID: d3f8a1c6b472
+Revises: b8d4f1e6a392
+Create Date: 2026-10-19 22:40:12.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f8a1c6b472'
+down_revision: Union[str, Sequence[str], None] = 'b8d4f1e6a392'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_structured_rules_rule_id_created_at', table_name='structured_rules')
+    op.create_index('ix_structured_rules_rule_id_created_at', 'structured_rules', ['rule_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_structured_rules_rule_id_created_at', table_name='structured_rules')
+    op.create_index('ix_structured_rules_rule_id_created_at', 'structured_rules', ['rule_id', sa.text('created_at DESC')], unique=False)
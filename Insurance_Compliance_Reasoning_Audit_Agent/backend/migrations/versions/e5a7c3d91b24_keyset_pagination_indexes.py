@@ -0,0 +1,32 @@
+"""Keyset pagination indexes
+
+Revision ID: e5a7c3d91b24
+Revises: 9c1d7e35a2f0
+Create Date: 2026-10-19 11:40:05.318276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c3d91b24'
+down_revision: Union[str, Sequence[str], None] = '9c1d7e35a2f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_workflow_events_submitted_at_id', 'workflow_events', [sa.text('submitted_at DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_compliance_decisions_created_at_id', 'compliance_decisions', [sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+    op.drop_index('ix_compliance_decisions_created_at', table_name='compliance_decisions')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_compliance_decisions_created_at', 'compliance_decisions', [sa.text('created_at DESC')], unique=False)
+    op.drop_index('ix_compliance_decisions_created_at_id', table_name='compliance_decisions')
+    op.drop_index('ix_workflow_events_submitted_at_id', table_name='workflow_events')
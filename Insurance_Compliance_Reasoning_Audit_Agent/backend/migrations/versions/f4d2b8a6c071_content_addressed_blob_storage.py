@@ -0,0 +1,63 @@
+"""Content-addressed blob storage for traces and raw AI output
+
+Revision ID: f4d2b8a6c071
+Revises: c8e4a1f7b935
+Create Date: 2026-10-19 14:37:58.610294
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4d2b8a6c071'
+down_revision: Union[str, Sequence[str], None] = 'c8e4a1f7b935'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite batch mode rebuilds the table and reflects these without their DESC
+# ordering. Frozen at this revision: the DESC indexes compliance_decisions has
+# here, not whatever the models declare later.
+DECISION_INDEXES = {
+    'ix_compliance_decisions_workflow_id_created_at': ['workflow_id', sa.text('created_at DESC')],
+    'ix_compliance_decisions_decision_created_at': ['decision', sa.text('created_at DESC')],
+    'ix_compliance_decisions_created_at_id': [sa.text('created_at DESC'), sa.text('id DESC')],
+}
+
+
+def _restore_decision_indexes() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for name, columns in DECISION_INDEXES.items():
+        op.drop_index(name, table_name='compliance_decisions')
+        op.create_index(name, 'compliance_decisions', columns, unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('content_blobs',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('encoding', sa.String(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    op.add_column('structured_rules', sa.Column('raw_ai_output_ref', sa.String(length=64), nullable=True))
+    # Existing decisions keep their inline trace; new ones reference content_blobs instead
+    with op.batch_alter_table('compliance_decisions') as batch_op:
+        batch_op.add_column(sa.Column('reasoning_trace_refs', sa.JSON(), nullable=True))
+        batch_op.alter_column('reasoning_trace', existing_type=sa.JSON(), nullable=True)
+    _restore_decision_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('compliance_decisions') as batch_op:
+        batch_op.alter_column('reasoning_trace', existing_type=sa.JSON(), nullable=False)
+        batch_op.drop_column('reasoning_trace_refs')
+    _restore_decision_indexes()
+    op.drop_column('structured_rules', 'raw_ai_output_ref')
+    op.drop_table('content_blobs')
@@ -0,0 +1,19 @@
+"""
+Recompute the decision_rollups table from compliance_decisions.
+
+The table is kept current by an insert listener (see app/rollups.py); run this
+to backfill after loading decisions outside the application or to repair drift.
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine
+from app import rollups
+
+
+if __name__ == "__main__":
+    with engine.begin() as connection:
+        rows = rollups.rebuild(connection)
+    print(f"Rebuilt decision_rollups: {rows} rows.")
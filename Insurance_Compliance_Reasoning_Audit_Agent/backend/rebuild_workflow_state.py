@@ -0,0 +1,20 @@
+"""
+Recompute the workflow_state table from workflow_events.
+
+The table is kept current by an insert listener (see app/workflow_state.py);
+run this to backfill after loading events outside the application or to
+repair drift.
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine
+from app import workflow_state
+
+
+if __name__ == "__main__":
+    with engine.begin() as connection:
+        rows = workflow_state.rebuild(connection)
+    print(f"Rebuilt workflow_state: {rows} rows.")
@@ -0,0 +1,48 @@
+import os
+os.environ["OPENAI_API_KEY"] = "sk-dummy"
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.group_commit import DecisionWriter
+from app.models import ComplianceDecision, ContentBlob, DecisionOutcome
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/group_commit.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+def test_failed_batch_retry_keeps_trace_blobs(session_factory, caplog):
+    # Both decisions wait for each other, so they are committed as one batch
+    writer = DecisionWriter(max_batch=2, max_wait_ms=1000)
+    trace = [{"rule_id": "R1", "status": "COMPLIANT", "reasoning": "claim_id present"}]
+
+    def write(outcome):
+        decision = ComplianceDecision(
+            workflow_id="WF-1",
+            decision=outcome,
+            violated_rules=[],
+            reasoning_trace=trace,
+            rule_versions={}
+        )
+        try:
+            return writer.write(session_factory(), decision).id
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(2) as pool:
+        good, bad = pool.map(write, [DecisionOutcome.COMPLIANT, None])
+
+    assert isinstance(bad, Exception)
+    assert "retrying singly" in caplog.text
+
+    db = session_factory()
+    try:
+        assert db.scalar(select(func.count()).select_from(ContentBlob)) == 1
+        assert db.get(ComplianceDecision, good).reasoning_trace == trace
+    finally:
+        db.close()
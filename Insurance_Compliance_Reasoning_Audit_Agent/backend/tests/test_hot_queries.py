@@ -0,0 +1,22 @@
+import os
+os.environ["OPENAI_API_KEY"] = "sk-dummy"
+
+import pytest
+from sqlalchemy import create_engine
+from app.database import Base
+from app.hot_queries import HOT_QUERIES, plan_problems
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_an_index(engine, name):
+    with engine.connect() as connection:
+        plan, problems = plan_problems(connection, HOT_QUERIES[name])
+    assert not problems, "\n".join(plan)
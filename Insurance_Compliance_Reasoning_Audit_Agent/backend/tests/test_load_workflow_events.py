@@ -0,0 +1,75 @@
+import os
+os.environ["OPENAI_API_KEY"] = "sk-dummy"
+
+import json
+import argparse
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import create_engine, insert, select, text
+from app.database import Base
+from app.models import WorkflowEvent, WorkflowState, WorkflowType
+import load_workflow_events
+
+
+def _indexes(engine):
+    with engine.connect() as connection:
+        return set(connection.execute(text(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'workflow_events'"
+        )).all())
+
+
+def _args(*files, **options):
+    defaults = {"format": None, "batch_size": 2, "rejects": None, "no_copy": False, "skip_state_rebuild": False}
+    return argparse.Namespace(files=list(files), **{**defaults, **options})
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/load.db")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def events_file(tmp_path):
+    path = tmp_path / "events.ndjson"
+    rows = [
+        {"workflow_id": "WF-1", "workflow_type": "CLAIM_PROCESSING", "attributes": {"step": 1}, "actor_id": "u1", "source_system": "claims", "submitted_at": "2019-01-01T00:00:00"},
+        {"workflow_id": "WF-2", "workflow_type": "CLAIM_PROCESSING", "attributes": {"step": 1}, "actor_id": "u1", "source_system": "claims", "submitted_at": "2019-01-02T00:00:00"},
+        {"workflow_id": "WF-1", "workflow_type": "CLAIM_PROCESSING", "attributes": {"step": 2}, "actor_id": "u1", "source_system": "claims", "submitted_at": "2019-01-03T00:00:00"}
+    ]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    return str(path)
+
+
+def test_load_keeps_fresh_index_set(tmp_path, engine, events_file):
+    fresh = create_engine(f"sqlite:///{tmp_path}/fresh.db")
+    Base.metadata.create_all(bind=fresh)
+
+    assert load_workflow_events.load(engine, _args(events_file)) == (3, 0)
+
+    assert _indexes(engine) == _indexes(fresh)
+    assert "ix_workflow_events_attributes" not in {name for name, _ in _indexes(engine)}
+    fresh.dispose()
+
+
+def test_load_folds_only_touched_workflows(engine, events_file):
+    with engine.begin() as connection:
+        # A state row the load must leave alone
+        connection.execute(insert(WorkflowState.__table__).values(
+            workflow_id="WF-OTHER", workflow_type=WorkflowType.CLAIM_PROCESSING, attributes={"kept": True},
+            actor_id="u2", source_system="claims", event_count=7, last_event_id=999,
+            last_submitted_at=datetime(2020, 1, 1, tzinfo=timezone.utc)
+        ))
+
+    load_workflow_events.load(engine, _args(events_file))
+
+    with engine.connect() as connection:
+        states = {row.workflow_id: row for row in connection.execute(select(WorkflowState.__table__))}
+        loaded = connection.execute(select(WorkflowEvent.id).where(WorkflowEvent.workflow_id == "WF-1")).scalars().all()
+    assert states["WF-OTHER"].event_count == 7
+    assert states["WF-1"].event_count == 2
+    assert states["WF-1"].attributes == {"step": 2}
+    assert states["WF-1"].last_event_id == max(loaded)
+    assert states["WF-2"].event_count == 1
@@ -0,0 +1,84 @@
+import os
+os.environ["OPENAI_API_KEY"] = "sk-dummy"
+
+import sqlite3
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.main import app, get_db
+from app.database import Base, build_async_engine, get_async_db, get_async_read_db
+
+
+def event(workflow_id):
+    return {
+        "workflow_id": workflow_id,
+        "workflow_type": "CLAIM_PROCESSING",
+        "attributes": {"claim_id": workflow_id},
+        "actor_id": "replica-test",
+        "source_system": "replica-test"
+    }
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """A primary and a replica SQLite file, with the app's dependencies routed to them."""
+    primary, replica = str(tmp_path / "primary.db"), str(tmp_path / "replica.db")
+    engine = create_engine(f"sqlite:///{primary}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    primary_async = build_async_engine(f"sqlite+aiosqlite:///{primary}")
+    replica_async = build_async_engine(f"sqlite+aiosqlite:///{replica}")
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def async_override(async_engine):
+        async def override():
+            async with async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)() as db:
+                yield db
+        return override
+
+    saved = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = async_override(primary_async)
+    app.dependency_overrides[get_async_read_db] = async_override(replica_async)
+    yield primary, replica
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(saved)
+    engine.dispose()
+
+
+def replicate(primary, replica):
+    """Stand-in for streaming replication: copy the primary onto the replica."""
+    source, target = sqlite3.connect(primary), sqlite3.connect(replica)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+
+def test_reads_use_replica_and_writes_use_primary(databases):
+    client = TestClient(app)
+    client.post("/users/", json={"username": "replica-test", "password": "replica-test"})
+    token = client.post(
+        "/token", data={"username": "replica-test", "password": "replica-test"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    replicate(*databases)
+
+    assert client.post("/workflows/", json=event("WF-1"), headers=headers).status_code == 201
+    # The replica lags until the next replicate()
+    assert client.get("/workflows/", headers=headers).json()["items"] == []
+    assert client.get("/decisions/search", headers=headers).json()["items"] == []
+    # Per-workflow reads must see the caller's own writes
+    assert len(client.get("/workflows/WF-1").json()) == 1
+
+    replicate(*databases)
+    assert [e["workflow_id"] for e in client.get("/workflows/", headers=headers).json()["items"]] == ["WF-1"]
@@ -29,7 +29,7 @@ function AuditContent() {
       const response = await api.getAllDecisions();
       if (response.ok) {
         const data = await response.json();
-        setDecisions(data);
+        setDecisions(data.items);
       }
     } catch (err) {
       setError('Failed to load audit trail');
@@ -61,6 +61,15 @@ function AuditContent() {
 
   const handleViewDetails = async (decision: any) => {
     setSelectedDecision(decision);
+    try {
+      // List rows are summaries; the reasoning trace comes from the detail endpoint
+      const detail = await api.getDecision(decision.workflow_id, decision.id);
+      if (detail.ok) {
+        setSelectedDecision(await detail.json());
+      }
+    } catch (err) {
+      console.error('Failed to fetch decision details', err);
+    }
     try {
       const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}/workflows/${decision.workflow_id}`, {
         headers: {
@@ -211,10 +220,10 @@ function AuditContent() {
                   <div>
                     <h3 className="text-sm font-bold text-slate-600 uppercase mb-3 border-b pb-1">AI Reasoning Trace</h3>
                     <div className="space-y-4">
-                      {selectedDecision.reasoning_trace.length === 0 && (
+                      {selectedDecision.reasoning_trace?.length === 0 && (
                         <p className="text-sm text-slate-500 italic">No reasoning steps recorded for this audit.</p>
                       )}
-                      {selectedDecision.reasoning_trace.map((trace: any, idx: number) => {
+                      {selectedDecision.reasoning_trace?.map((trace: any, idx: number) => {
                         // Handle legacy or specific error formats
                         if (trace.error || trace.info) {
                           return (
@@ -234,7 +243,7 @@ function AuditContent() {
                             <div className="flex justify-between items-center mb-3">
                               <p className="font-bold text-slate-800">{trace.rule_id || 'Unknown Rule'}</p>
                               <span className="text-xs text-slate-600 font-bold">
-                                {trace.rule_id && selectedDecision.rule_versions[trace.rule_id] ? `v${selectedDecision.rule_versions[trace.rule_id]}` : ''}
+                                {trace.rule_id && selectedDecision.rule_versions?.[trace.rule_id] ? `v${selectedDecision.rule_versions[trace.rule_id]}` : ''}
                               </span>
                             </div>
                             <div className="space-y-3">
@@ -26,7 +26,7 @@ export default function RulesPage() {
       const response = await api.getRules();
       if (response.ok) {
         const data = await response.json();
-        setRules(data);
+        setRules(data.items);
       }
     } catch (err) {
       setError('Failed to load rules');
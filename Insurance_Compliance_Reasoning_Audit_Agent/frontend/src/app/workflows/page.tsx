@@ -25,7 +25,7 @@ export default function WorkflowsPage() {
       const response = await api.getWorkflows();
       if (response.ok) {
         const data = await response.json();
-        setWorkflows(data);
+        setWorkflows(data.items);
       }
     } catch (err) {
       setError('Failed to load workflows');
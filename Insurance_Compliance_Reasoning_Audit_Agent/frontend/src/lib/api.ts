@@ -24,6 +24,10 @@ export async function fetchWithAuth(endpoint: string, options: RequestInit = {})
   return response;
 }
 
+// List endpoints return { items, next_cursor }; pass next_cursor back to get the next page
+const withCursor = (endpoint: string, cursor?: string | null) =>
+  cursor ? `${endpoint}?cursor=${encodeURIComponent(cursor)}` : endpoint;
+
 export const api = {
   login: (username: string, password: string) => {
     const formData = new FormData();
@@ -34,26 +38,37 @@ export const api = {
       body: formData,
     });
   },
-  getRules: () => fetchWithAuth('/rules/'),
+  getRules: (cursor?: string | null) => fetchWithAuth(withCursor('/rules/', cursor)),
   createRule: (rule: any) => fetchWithAuth('/rules/', {
     method: 'POST',
     body: JSON.stringify(rule),
   }),
-  getWorkflows: () => fetchWithAuth('/workflows/'),
+  getWorkflows: (cursor?: string | null) => fetchWithAuth(withCursor('/workflows/', cursor)),
   createWorkflow: (workflow: any) => fetchWithAuth('/workflows/', {
     method: 'POST',
     body: JSON.stringify(workflow),
   }),
+  createWorkflows: (workflows: any[]) => fetchWithAuth('/workflows/bulk', {
+    method: 'POST',
+    body: JSON.stringify(workflows),
+  }),
   auditWorkflow: (workflowId: string) => fetchWithAuth(`/workflows/${workflowId}/audit`, {
     method: 'POST',
   }),
-  getAllDecisions: () => fetchWithAuth('/decisions/'),
+  getAllDecisions: (cursor?: string | null) => fetchWithAuth(withCursor('/decisions/', cursor)),
   getDecisions: (workflowId: string) => fetchWithAuth(`/decisions/${workflowId}`),
+  getDecision: (workflowId: string, decisionId: number) => fetchWithAuth(`/decisions/${workflowId}/${decisionId}`),
+  searchDecisions: (filters: Record<string, string>) => fetchWithAuth(`/decisions/search?${new URLSearchParams(filters)}`),
   replayDecision: (workflowId: string, decisionId: number) => fetchWithAuth(`/workflows/${workflowId}/replay/${decisionId}`, {
     method: 'POST',
   }),
+  replayDecisions: (decisionIds: number[]) => fetchWithAuth('/decisions/replay', {
+    method: 'POST',
+    body: JSON.stringify({ decision_ids: decisionIds }),
+  }),
   getDashboardStats: () => fetchWithAuth('/dashboard/stats'),
   getSystemMetrics: () => fetchWithAuth('/dashboard/metrics'),
   getHealth: () => fetch('/health'), // Public endpoint
   getStructuredRules: (ruleId: string) => fetchWithAuth(`/rules/${ruleId}/structured`),
+  getStructuredRule: (ruleId: string, structuredId: number) => fetchWithAuth(`/rules/${ruleId}/structured/${structuredId}`),
 };